@@ -0,0 +1,198 @@
+#
+# Benchmarks of graph operations on synthetic registries
+#
+#   python benchmarks/bench_graph.py --sizes 10 100 1000 --output bench.json
+#   python benchmarks/bench_graph.py --compare bench.json  # ratios to a previous run
+#
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from lib.node import NodeSI, NodeMI
+from lib.registry import registry, hook_parent
+
+TOPOLOGIES = ['chain', 'fanout', 'diamond', 'quantum']
+OPERATIONS = ['compile', 'build_graph', 'check_graph', 'seek', 'retr', 'getitem', 'traverse', 'draw_graph']
+
+
+def make_class(name, base=NodeSI, parents=None, backward=True):
+    """
+    Create a node class named name, hooked to parents (arguments of @hook_parent)
+    """
+    node_class = type(name, (base,), {
+        '__str__': lambda self: name,
+        'forward': lambda self: True,
+        'backward': lambda self: backward,
+    })
+    if parents is not None:
+        node_class = hook_parent(*parents)(node_class)
+    return node_class
+
+
+def make_chain(size):
+    """ root -> n1 -> n2 -> ... """
+    root = last = make_class('root')
+    for i in range(1, size):
+        last = make_class('n{}'.format(i), parents=[last])
+    return root, str(last.__name__)
+
+
+def make_fanout(size):
+    """ root -> n1, root -> n2, ... """
+    root = make_class('root')
+    for i in range(1, size):
+        last = make_class('n{}'.format(i), parents=[root])
+    return root, 'n{}'.format(size - 1)
+
+
+def make_diamond(size):
+    """
+    root -> (l1, r1) -> m1 -> (l2, r2) -> m2 -> ...
+
+    retr explores every path upwards, whose number grows exponentially with the
+    number of diamonds, so backward of right branches stops the exploration
+    """
+    root = last = make_class('root')
+    for i in range(1, max(size // 3, 1) + 1):
+        left = make_class('l{}'.format(i), parents=[last])
+        right = make_class('r{}'.format(i), parents=[last], backward=False)
+        last = make_class('m{}'.format(i), base=NodeMI, parents=[left, right])
+    return root, 'm{}'.format(max(size // 3, 1))
+
+
+def make_quantum(size):
+    """
+    root -> h1, h2, ..., hk; [h1, ..., hk] stacked into quantum q (k layers) ->
+    quantum child c (k layers); (c, i) collapsed into s1, s2, ...
+    """
+    num_heads = max(size // 4, 1)
+    root = make_class('root')
+    heads = [make_class('h{}'.format(i), parents=[root]) for i in range(num_heads)]
+    quantum = make_class('q', parents=[heads])
+    child = make_class('c', parents=[quantum])
+    for i in range(num_heads):
+        make_class('s{}'.format(i), parents=[(child, i)])
+    return root, 's{}'.format(num_heads - 1)
+
+
+def timeit(function, setup=None, repeat=5):
+    """
+    Return the list of run times (ms) of function(setup()) over repeats
+    """
+    times = list()
+    for _ in range(repeat):
+        arg = setup() if setup is not None else None
+        start_time = time.perf_counter()
+        function(arg)
+        times.append((time.perf_counter() - start_time) * 1e3)
+    return times
+
+
+def bench_case(topology, size, repeat):
+    """
+    Benchmark operations on the graph of a topology, return the list of results
+    """
+    registry._lineage.clear()
+    root_class, target_name = globals()['make_' + topology](size)
+
+    def _new_root(_=None):
+        return root_class()
+
+    def _build_root(_=None):
+        root = root_class.__new__(root_class)
+        root._build_graph()
+        return root
+
+    def _unchecked_root():
+        root = _build_root()
+        root._graph.template.name_index = None
+        return root
+
+    def _seeked_root():
+        root = _new_root()
+        return root, root.seek(target_name)
+
+    results = dict()
+    results['compile'] = timeit(lambda _: (registry.invalidate(), _new_root()), repeat=1)
+    results['build_graph'] = timeit(_build_root, repeat=repeat)
+    results['check_graph'] = timeit(lambda root: root._check_graph(), setup=_unchecked_root, repeat=repeat)
+    results['seek'] = timeit(lambda root: root.seek(target_name), setup=_new_root, repeat=repeat)
+    results['retr'] = timeit(lambda nodes: nodes[1].retr('root'), setup=_seeked_root, repeat=repeat)
+    names = _new_root().traverse(str)
+    results['getitem'] = timeit(lambda root: [root[name] for name in names], setup=_new_root, repeat=repeat)
+    results['traverse'] = timeit(lambda root: root.traverse(str), setup=_new_root, repeat=repeat)
+    results['draw_graph'] = timeit(lambda root: root._build_digraph(), setup=_new_root, repeat=repeat)
+
+    num_slots = len(_new_root()._graph)
+    registry._lineage.clear()
+    return [
+        {
+            'topology': topology, 'size': size, 'num_slots': num_slots, 'operation': operation,
+            'repeat': len(times), 'min_ms': min(times), 'median_ms': statistics.median(times),
+            'mean_ms': statistics.mean(times),
+        }
+        for operation, times in results.items()
+    ]
+
+
+def compare(results, baseline_results, threshold):
+    """
+    Print ratios of median times to a previous run, return the number of regressions
+    """
+    baseline = {(x['topology'], x['size'], x['operation']): x for x in baseline_results}
+    num_regressions = 0
+    for result in results:
+        base = baseline.get((result['topology'], result['size'], result['operation']))
+        if base is None or base['median_ms'] == 0:
+            continue
+        ratio = result['median_ms'] / base['median_ms']
+        regressed = ratio > threshold
+        num_regressions += regressed
+        print('{:<8} {:>6} {:<12} {:>6.2f}x{}'.format(
+            result['topology'], result['size'], result['operation'], ratio,
+            '  REGRESSION' if regressed else ''))
+    return num_regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark graph operations on synthetic registries')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000])
+    parser.add_argument('--topologies', nargs='+', choices=TOPOLOGIES, default=TOPOLOGIES)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='path of the JSON report')
+    parser.add_argument('--compare', help='path of a previous JSON report to compare with')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='ratio of median times reported as a regression')
+    args = parser.parse_args()
+
+    results = list()
+    for topology in args.topologies:
+        for size in args.sizes:
+            for result in bench_case(topology, size, args.repeat):
+                results.append(result)
+                print('{topology:<8} {size:>6} {num_slots:>6} {operation:<12} {median_ms:>10.3f} ms'.format(**result))
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline_results = json.load(f)['results']
+        if compare(results, baseline_results, args.threshold) > 0:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
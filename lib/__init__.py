@@ -1,19 +1,39 @@
 from .registry import hook_parent
 from .registry import static_initializer
+from .registry import static_modules
+from .cache import cache_forward
+from .cache import persist_forward
+from .warmup import warm_up
 from .node import NodeBase
 from .node import NodeSI
 from .node import NodeMI
 from .node import NodeCI
 from .node import NodeNI
 from .node import NodePI
+from .pool import GraphPool
+from .batch import GraphBatch
+from .runner import GraphRunner
+from .runner import Pipeline
+from .profiler import Profiler
+from .profiler import Tracer
 
 __all__ = [
     'hook_parent',
     'static_initializer',
+    'static_modules',
+    'cache_forward',
+    'persist_forward',
+    'warm_up',
     'NodeBase',
     'NodeSI',
     'NodeMI',
     'NodeCI',
     'NodeNI',
     'NodePI',
+    'GraphPool',
+    'GraphBatch',
+    'GraphRunner',
+    'Pipeline',
+    'Profiler',
+    'Tracer',
 ]
\ No newline at end of file
@@ -0,0 +1,151 @@
+#
+# Batched execution of graphs over many inputs
+#
+from .node import NodeBase
+from .state import ForwardState
+from .schedule import ForwardSchedule
+from .profiler import observers, observe, outcome_of
+
+__all__ = ['GraphBatch']
+
+
+def _mask_outcome(mask, num_nodes):
+    """
+    Outcome of a forward_batch() run: failure if any node fails, error if the mask
+    is rejected
+    """
+    if len(mask) != num_nodes:
+        return ForwardState.error
+    outcomes = set(outcome_of(success) for success in mask)
+    for outcome in [ForwardState.error, ForwardState.failure]:
+        if outcome in outcomes:
+            return outcome
+    return ForwardState.success
+
+
+class GraphBatch(object):
+    """
+    A batch of graphs of the same bootstrap class, one graph per datum, which are
+    forwarded in lockstep: nodes of the same class that are ready at the same time
+    in different graphs are forwarded together by one forward_batch() call.
+    Success or failure of every node still gates its children in its own graph.
+    """
+    def __init__(self, nodes):
+        """
+        Args:
+            nodes: bootstrap nodes of the graphs, one per datum
+        """
+        self._nodes = list(nodes)
+        node_classes = set(type(node) for node in self._nodes)
+        assert len(node_classes) <= 1, \
+            "Graphs in a batch should share the bootstrap class, but found: {}".format(node_classes)
+        # nodes are grouped by their slots in the template
+        assert len(set(id(node._graph.template) for node in self._nodes)) <= 1, \
+            "Graphs in a batch should share the graph template, rebuild graphs created before the lineage changed"
+
+    @classmethod
+    def from_inputs(cls, node_class, inputs, feed):
+        """
+        Build a batch of graphs of node_class, with a datum of inputs fed into each
+        graph by calling feed(bootstrap_node, datum)
+        """
+        nodes = list()
+        for datum in inputs:
+            node = node_class()
+            feed(node, datum)
+            nodes.append(node)
+        return cls(nodes)
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __getitem__(self, index):
+        return self._nodes[index]
+
+    def __iter__(self):
+        return iter(self._nodes)
+
+    def _forward_to_nodes(self, targets_per_graph):
+        schedules = [ForwardSchedule(targets) for targets in targets_per_graph]
+        ready_nodes = [schedule.start() for schedule in schedules]
+        while any(ready_nodes):
+            ## 1) group ready nodes of all graphs by their slots
+            groups = dict()  # {slot index: [(graph id, node), ...]}
+            for graph_id, nodes in enumerate(ready_nodes):
+                for node in nodes:
+                    groups.setdefault(node._index, []).append((graph_id, node))
+
+            ## 2) forward each group at once, and collect nodes ready next
+            ready_nodes = [list() for _ in schedules]
+            for members in groups.values():
+                self._run_forward_batch([node for _, node in members])
+                for graph_id, node in members:
+                    ready_nodes[graph_id].extend(schedules[graph_id].finish(node))
+
+    @staticmethod
+    def _run_forward_batch(nodes):
+        node_class = type(nodes[0])
+        if node_class.forward_batch.__func__ is NodeBase.forward_batch.__func__:
+            for node in nodes:
+                node._run_forward()
+            return
+
+        ## 1) settle nodes found in the forward cache
+        missed_nodes, cache_misses = list(), list()
+        for node in nodes:
+            cache_miss = node._lookup_forward_cache()
+            if node._forward_state == ForwardState.unvisited:
+                missed_nodes.append(node)
+                cache_misses.append(cache_miss)
+        if len(missed_nodes) == 0:
+            return
+        nodes = missed_nodes
+
+        ## 2) forward the rest at once
+        if observers:
+            mask = observe(nodes[0], 'forward_batch', lambda: list(node_class.forward_batch(nodes)),
+                           lambda mask: _mask_outcome(mask, len(nodes)))
+        else:
+            mask = list(node_class.forward_batch(nodes))
+        if len(mask) != len(nodes):
+            raise RuntimeError(
+                "{} forward_batch() should return a mask of {} booleans, "
+                "while it returns {}".format(node_class, len(nodes), len(mask))
+            )
+        for node, success, cache_miss in zip(nodes, mask, cache_misses):
+            node._settle_forward(success)
+            if cache_miss is not None:
+                node._store_forward_cache(*cache_miss)
+
+    def seek(self, node_name:str):
+        """
+        reach node in all graphs, see NodeBase.seek()
+
+        Return:
+            a list of node objects with the node_name (None if not reached), one per graph
+        """
+        target_nodes = [node[node_name] for node in self._nodes]
+        self._forward_to_nodes([[node] for node in target_nodes])
+        return [node if node._forward_state == ForwardState.success else None for node in target_nodes]
+
+    def seek_many(self, node_names):
+        """
+        reach several nodes in all graphs, see NodeBase.seek_many()
+
+        Return:
+            a list of dictionaries {node name: node object or None}, one per graph
+        """
+        targets_per_graph = [[node[node_name] for node_name in node_names] for node in self._nodes]
+        self._forward_to_nodes(targets_per_graph)
+        return [
+            {str(node): node if node._forward_state == ForwardState.success else None for node in targets}
+            for targets in targets_per_graph
+        ]
+
+    def reset(self):
+        """
+        Reset all graphs, see NodeBase.reset()
+        """
+        for node in self._nodes:
+            node.reset()
+
@@ -0,0 +1,350 @@
+#
+# Caching of forward results of nodes
+#
+# NOTE: modules only used by DiskStore are imported on use, to keep `import lib` fast
+import os
+import sys
+import threading
+import collections
+
+__all__ = ['ForwardCache', 'DiskStore', 'cache_forward', 'persist_forward']
+
+
+def sizeof(obj):
+    """
+    Estimate memory size in bytes of an object: nbytes of arrays, or sys.getsizeof()
+    of other objects
+    """
+    size = getattr(obj, 'nbytes', None)
+    return size if isinstance(size, int) else sys.getsizeof(obj)
+
+
+def estimate_size(attributes):
+    """
+    Estimate memory size in bytes of node attributes (see sizeof)
+    """
+    return sum(sizeof(val) for val in attributes.values())
+
+
+class ForwardCache(object):
+    """
+    LRU cache of forward results of a node class, shared by nodes of all graphs.
+    Results are keyed by the class and the fingerprint of a node, which is usually
+    computed from outputs of its parents, so subclasses never share results. A result is the success of forward() and the attributes
+    it sets on the node.
+    """
+    def __init__(self, fingerprint, maxsize=128, maxbytes=None):
+        """
+        Args:
+            - fingerprint: callable fingerprint(node) returning a hashable key of the
+            inputs of node, or None if the node should not be cached
+            - maxsize: maximum number of cached results
+            - maxbytes: optional maximum memory size of cached results (see estimate_size)
+        """
+        assert maxsize > 0, "maxsize should be positive"
+        self._fingerprint = fingerprint
+        self._maxsize = maxsize
+        self._maxbytes = maxbytes
+        self._entries = collections.OrderedDict()  # {key: (success, attributes, nbytes)}
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, node):
+        fingerprint = self._fingerprint(node)
+        if fingerprint is None:
+            return None
+        return type(node), fingerprint
+
+    def get(self, key):
+        """
+        Return cached (success, attributes) of key, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[:2]
+
+    def put(self, key, success, attributes):
+        nbytes = estimate_size(attributes)
+        if self._maxbytes is not None and nbytes > self._maxbytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._nbytes -= self._entries.pop(key)[2]
+            self._entries[key] = (success, attributes, nbytes)
+            self._nbytes += nbytes
+            # evict least recently used results
+            while len(self._entries) > self._maxsize or \
+                    (self._maxbytes is not None and self._nbytes > self._maxbytes):
+                _, (_, _, evicted_nbytes) = self._entries.popitem(last=False)
+                self._nbytes -= evicted_nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    @property
+    def hit_rate(self):
+        num_lookups = self.hits + self.misses
+        return self.hits / num_lookups if num_lookups > 0 else 0.
+
+    @property
+    def stats(self):
+        return {
+            'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate,
+            'size': len(self), 'nbytes': self.nbytes,
+        }
+
+
+def cache_forward(fingerprint, maxsize=128, maxbytes=None):
+    """
+    Class decorator to cache forward results of a node class (see ForwardCache):
+
+        @hook_parent(Image)
+        @cache_forward(lambda node: node.parent.image_id)
+        class Detect(NodeSI):
+            ...
+
+    On a cache hit, forward() is skipped: the cached attributes are set on the node
+    and its forward state is settled directly. Cached attribute values are shared by
+    nodes of all graphs, don't modify them in place.
+    """
+    def class_decorator(node_class):
+        node_class._forward_cache = ForwardCache(fingerprint, maxsize, maxbytes)
+        return node_class
+    return class_decorator
+
+
+def code_hash(node_class):
+    """
+    Hash of the source code of a node class, or of the bytecode of its forward
+    methods if the source is not available
+    """
+    import inspect
+    import hashlib
+    try:
+        code = inspect.getsource(node_class).encode()
+    except (OSError, TypeError):
+        code = b''.join(
+            getattr(node_class, name).__code__.co_code
+            for name in ('forward', 'forward_batch') if hasattr(getattr(node_class, name), '__code__')
+        )
+    return hashlib.sha1(code).hexdigest()[:12]
+
+
+def _is_array(val):
+    return type(val).__module__ == 'numpy' and type(val).__name__ == 'ndarray' \
+        and not val.dtype.hasobject
+
+
+class DiskStore(object):
+    """
+    Persistent store of forward results of a node class, in a local directory shared
+    by runs and processes. A result is kept in its own sub-directory, keyed by the
+    node class, the hash of its source code and the input fingerprint of a node:
+
+        directory/module.ClassName-<code hash>/<fingerprint hash>/
+            meta.pkl        # success of forward() and names of attributes
+            attributes.pkl  # pickled attributes
+            <name>.npy      # numpy arrays, memory-mapped read-only when loaded
+
+    Editing a node class invalidates its results. Once maxbytes is exceeded, least
+    recently used results of the directory are evicted down to 90% of maxbytes. The
+    size of the directory is scanned only then: in between, a process counts the
+    results it stores itself, so maxbytes is approximate for stores shared by
+    processes.
+    """
+    def __init__(self, directory, fingerprint, maxbytes=None):
+        """
+        Args:
+            - directory: directory of results, created if missing
+            - fingerprint: callable fingerprint(node) returning a picklable key of the
+            inputs of node, or None if the node should not be stored
+            - maxbytes: optional maximum disk size of results in directory
+        """
+        self._directory = directory
+        self._fingerprint = fingerprint
+        self._maxbytes = maxbytes
+        self._lock = threading.Lock()
+        self._class_dirs = dict()  # {node_class: sub-directory}, source code is hashed once
+        self._nbytes = None  # disk size of the directory since the last scan, None before
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, node):
+        import pickle
+        import hashlib
+        fingerprint = self._fingerprint(node)
+        if fingerprint is None:
+            return None
+        node_class = type(node)
+        class_dir = self._class_dirs.get(node_class)
+        if class_dir is None:
+            class_dir = '{}.{}-{}'.format(node_class.__module__, node_class.__qualname__, code_hash(node_class))
+            self._class_dirs[node_class] = class_dir
+        digest = hashlib.sha1(pickle.dumps(fingerprint, protocol=4)).hexdigest()
+        return os.path.join(class_dir, digest)
+
+    def get(self, key):
+        """
+        Return stored (success, attributes) of key, or None on a miss
+        """
+        import pickle
+        entry_dir = os.path.join(self._directory, key)
+        try:
+            with open(os.path.join(entry_dir, 'meta.pkl'), 'rb') as f:
+                success, array_names = pickle.load(f)
+            with open(os.path.join(entry_dir, 'attributes.pkl'), 'rb') as f:
+                attributes = pickle.load(f)
+            if len(array_names) > 0:
+                import numpy as np
+                for name in array_names:
+                    attributes[name] = np.load(os.path.join(entry_dir, name + '.npy'), mmap_mode='r')
+            os.utime(entry_dir)  # mark as recently used
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            # missing, evicted, or partially evicted by another process
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return success, attributes
+
+    def put(self, key, success, attributes):
+        import uuid
+        import pickle
+        import shutil
+        entry_dir = os.path.join(self._directory, key)
+        if os.path.isdir(entry_dir):
+            return
+        # write to a temporary directory first, so readers never see partial results
+        temp_dir = '{}.tmp-{}'.format(entry_dir, uuid.uuid4().hex)
+        os.makedirs(temp_dir)
+        try:
+            arrays = {name: val for name, val in attributes.items() if _is_array(val)}
+            if len(arrays) > 0:
+                import numpy as np
+                for name, val in arrays.items():
+                    np.save(os.path.join(temp_dir, name + '.npy'), val)
+            with open(os.path.join(temp_dir, 'attributes.pkl'), 'wb') as f:
+                pickle.dump({name: val for name, val in attributes.items() if name not in arrays}, f)
+            with open(os.path.join(temp_dir, 'meta.pkl'), 'wb') as f:
+                pickle.dump((success, list(arrays)), f)
+            entry_nbytes = sum(f.stat().st_size for f in os.scandir(temp_dir))
+            os.rename(temp_dir, entry_dir)
+        except OSError:
+            # stored by another process in the meantime, or the disk is full
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            return
+        except:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+        if self._maxbytes is not None:
+            with self._lock:
+                if self._nbytes is not None:
+                    self._nbytes += entry_nbytes
+                if self._nbytes is None or self._nbytes > self._maxbytes:
+                    self._evict()
+
+    def _entries(self):
+        """
+        Return the list of (last used time, disk size, entry directory) of stored results
+        """
+        entries = list()
+        for class_entry in os.scandir(self._directory):
+            if not class_entry.is_dir():
+                continue
+            for entry in os.scandir(class_entry.path):
+                if '.tmp-' in entry.name or not entry.is_dir():
+                    continue
+                try:
+                    nbytes = sum(f.stat().st_size for f in os.scandir(entry.path))
+                    entries.append((entry.stat().st_mtime, nbytes, entry.path))
+                except OSError:
+                    continue  # evicted by another process
+        return entries
+
+    def _evict(self):
+        """
+        Scan the directory, and evict least recently used results down to 90% of
+        maxbytes if it is exceeded, so that the next scan is some puts away
+        """
+        import shutil
+        entries = sorted(self._entries())
+        nbytes = sum(entry[1] for entry in entries)
+        if nbytes > self._maxbytes:
+            for _, entry_nbytes, entry_dir in entries:
+                if nbytes <= 0.9 * self._maxbytes:
+                    break
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                nbytes -= entry_nbytes
+        self._nbytes = nbytes
+
+    def clear(self):
+        import shutil
+        with self._lock:
+            for entry in os.scandir(self._directory):
+                if entry.is_dir():
+                    shutil.rmtree(entry.path, ignore_errors=True)
+            self._nbytes = 0
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        """
+        Number of stored results, the directory is scanned (expensive for large stores)
+        """
+        return len(self._entries())
+
+    @property
+    def nbytes(self):
+        """
+        Disk size of stored results, the directory is scanned (expensive for large stores)
+        """
+        return sum(entry[1] for entry in self._entries())
+
+    @property
+    def hit_rate(self):
+        num_lookups = self.hits + self.misses
+        return self.hits / num_lookups if num_lookups > 0 else 0.
+
+    @property
+    def stats(self):
+        return {
+            'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate,
+            'size': len(self), 'nbytes': self.nbytes,
+        }
+
+
+def persist_forward(directory, fingerprint, maxbytes=None):
+    """
+    Class decorator to store forward results of a node class on disk (see DiskStore),
+    so that reruns load unchanged results instead of recomputing them:
+
+        @hook_parent(Image)
+        @persist_forward('/data/cache', lambda node: node.parent.image_path)
+        class Detect(NodeSI):
+            ...
+
+    Stored attributes should be picklable. Loaded numpy arrays are memory-mapped
+    read-only.
+    """
+    def class_decorator(node_class):
+        node_class._forward_cache = DiskStore(directory, fingerprint, maxbytes)
+        return node_class
+    return class_decorator
@@ -1,41 +1,172 @@
+import weakref
+import itertools
+import threading
+from array import array
+
+
+class GraphTemplate(object):
+    """
+    Immutable topology of a graph, compiled once from the clean lineage of a
+    bootstrap class. Each layer of each node class takes one slot, nodes of a
+    graph are addressed by their slot index.
+    """
+    def __init__(self, lineage, bootstrap_class):
+        self.classes    = list()          # node class of each slot
+        self.layer_ids  = array('l')      # layer (quantum) id of each slot
+        self.num_layers = array('l')      # number of layers of the class of each slot
+        # parent slot indices of slot i: parent_indices[parent_offsets[i]:parent_offsets[i+1]]
+        self.parent_offsets = array('l', [0])
+        self.parent_indices = array('l')
+
+        ## 1) allocate slots for all layers of node classes
+        slot_ids = dict()  # {(node_class, layer_id): slot index}
+        for node_class, parent_list in lineage.items():
+            num_layers = 1 if len(parent_list) == 0 else len(parent_list[0])
+            for layer_id in range(num_layers):
+                slot_ids[(node_class, layer_id)] = len(self.classes)
+                self.classes.append(node_class)
+                self.layer_ids.append(layer_id)
+                self.num_layers.append(num_layers)
+
+        ## 2) connect parents by slot indices
+        for node_class, layer_id in zip(self.classes, self.layer_ids):
+            parent_list = lineage[node_class]
+            self.parent_indices.extend(slot_ids[parent_group[layer_id]] for parent_group in parent_list)
+            self.parent_offsets.append(len(self.parent_indices))
+
+        self.roots   = bytearray(
+            self.parent_offsets[index] == self.parent_offsets[index + 1] for index in range(len(self.classes)))
+        self.quantum = bytearray(num_layers > 1 for num_layers in self.num_layers)
+        # representatives of all nodes: their first layer
+        self.surface = [index for index, layer_id in enumerate(self.layer_ids) if layer_id == 0]
+        # representatives of nodes without children
+        parent_classes = set(self.classes[index] for index in self.parent_indices)
+        self.leaves = [index for index in self.surface if self.classes[index] not in parent_classes]
+        # slot of the bootstrap node, None if bootstrap class is not registered
+        self.bootstrap_index = slot_ids.get((bootstrap_class, 0))
+        # {node name: slot index} of surface nodes, set once names are checked
+        self.name_index = None
+
+    def parents(self, index):
+        """
+        Return parent slot indices of slot index
+        """
+        return self.parent_indices[self.parent_offsets[index]:self.parent_offsets[index + 1]]
+
+    def __len__(self):
+        return len(self.classes)
+
+
+# ids of graphs of the process, to identify nodes by (graph id, slot index)
+_graph_ids = itertools.count()
+
+
 class Graph(object):
     """
     Graph class to manage graph info (edge connections etc.)
+
+    Slots of nodes can be left empty (None) to materialize nodes lazily: a node is
+    created, together with its missing ancestors, when it is first accessed.
+
+    The bootstrap node owns the graph, so its slot keeps a weak reference to it
+    rather than the node itself.
     """
-    def __init__(self):
-        self._graph = dict()
+    def __init__(self, template, nodes):
+        assert len(template) == len(nodes)
+        self.id = next(_graph_ids)
+        self.template = template
+        self._nodes = nodes
+        self._bootstrap_index = template.bootstrap_index
+        self._parents = [None] * len(nodes)  # parent nodes, resolved on first access
+        self._states = bytearray(len(nodes))  # forward state values of nodes (see ForwardState)
         self._notice_board = dict()
+        self._proxy = weakref.proxy(self)  # nodes weakly link to graph
+        self._lock = threading.RLock()
 
-    def __setitem__(self, key, val):
-        assert isinstance(val, dict)
-        assert 'node' in val
-        if isinstance(key, str):
-            self._graph[key] = val
-        else:
-            self._graph[key._identity] = val
+    def __del__(self):
+        # hand forward states over to nodes outliving the graph
+        for index, node in enumerate(self._nodes):
+            if node is not None and index != self._bootstrap_index:
+                node._detached_state = self._states[index]
+
+    def __len__(self):
+        return len(self._nodes)
 
     def __getitem__(self, key):
-        if isinstance(key, str):
-            return self._graph[key]
+        """
+        Return info of a node, given by its slot index, the node, or its identity
+        """
+        if isinstance(key, int):
+            index = key
         else:
-            return self._graph[key._identity]
+            graph_id, index = key if isinstance(key, tuple) else key._identity
+            assert graph_id == self.id, "node of graph {} is not in graph {}".format(graph_id, self.id)
+        return {
+            'class': self.template.classes[index],
+            'node': self.node(index),
+            'parents': self.parents(index),
+            'num_layers': self.template.num_layers[index],
+            'layer_id': self.template.layer_ids[index],
+            'quantum': bool(self.template.quantum[index]),
+            'root': bool(self.template.roots[index]),
+        }
 
-    def keys(self):
-        return self._graph.keys()
+    def node(self, index):
+        node = self._nodes[index]
+        if node is None:
+            with self._lock:
+                if self._nodes[index] is None:
+                    self._materialize(index)
+            node = self._nodes[index]
+        elif index == self._bootstrap_index:
+            node = node()
+        return node
 
-    def values(self):
-        return self._graph.values()
+    def _materialize(self, index):
+        """
+        Create the missing node of slot index and its missing ancestors, then
+        initialize them once they are all linked
+        """
+        created = list()
+        stack = [index]
+        while len(stack) > 0:
+            index = stack.pop()
+            if self._nodes[index] is not None:
+                continue
+            node = self.template.classes[index](bootstrap_node=False)
+            node._index = index
+            node._graph = self._proxy
+            node._graph_id = self.id
+            self._nodes[index] = node
+            created.append(node)
+            stack.extend(self.template.parents(index))
+
+        for node in reversed(created):
+            node._initialize_node()
+
+    def parents(self, index):
+        parents = self._parents[index]
+        if parents is None:
+            parent_indices = self.template.parents(index)
+            parents = [self.node(parent_index) for parent_index in parent_indices]
+            # the bootstrap node is kept out of the cache, not to be owned by the graph
+            if self._bootstrap_index not in parent_indices:
+                self._parents[index] = parents
+        return parents
+
+    def reset_states(self):
+        """
+        Set forward states of all nodes back to unvisited
+        """
+        self._states[:] = bytes(len(self._states))
 
     def nodes(self):
-        for node_info in self.values():
-            yield node_info['node']
+        """
+        Iterate existing nodes, nodes not materialized yet are skipped
+        """
+        return (self.node(index) for index, node in enumerate(self._nodes) if node is not None)
 
     def items(self):
-        for node_info in self.values():
-            yield node_info['node'], node_info
-
-    def pop(self, key):
-        if isinstance(key, str):
-            self._graph.pop(key)
-        else:
-            self._graph.pop(key._identity)
\ No newline at end of file
+        for index, node in enumerate(self._nodes):
+            if node is not None:
+                yield self.node(index), self[index]
@@ -1,21 +1,30 @@
 import weakref
-import copy
-import uuid
-import hashlib
-from enum import Enum
-from graphviz import Digraph
 
 from .registry import registry
 from .graph import Graph
+from .graph import GraphTemplate
+from .state import ForwardState
+from .schedule import forward_concurrently
+from .schedule import forward_asynchronously
+from .profiler import observers, observe, aobserve
 
-class ForwardState(Enum):
-    unvisited = 0
-    success = 1
-    failure = 2
-    error = 3  # in case of exception
+
+# forward states by their values, see Graph._states
+_forward_states = tuple(ForwardState)
 
 
 class NodeBase(object):
+    # framework-owned attributes are slots, outputs of nodes stay in __dict__
+    __slots__ = ('_graph', '_graph_id', '_index', '_detached_state', '__dict__', '__weakref__')
+
+    # cache of forward results shared by nodes of the class, see cache_forward()
+    _forward_cache = None
+
+    # create nodes of graphs of the bootstrap class only once they are accessed
+    # (seek, retr, indexing, etc.), so that graph creation costs scale with the
+    # nodes in use. The first graph of the class is always complete.
+    lazy_graph = False
+
     def __init__(self, bootstrap_node=True):
         """
         Initialize a node.
@@ -25,45 +34,69 @@ class NodeBase(object):
             A graph is usually built from one node (by calling classmethod), which we call it
             bootstrap node.
         """
-        # create identity, which won't change when being weakly referenced
-        self._identity = hashlib.md5(uuid.uuid1().bytes).hexdigest()
-
-        # dynamic states, to record if an node node being forwarded
-        # _forward_state is an enum instance:
-        self._forward_state = ForwardState.unvisited
-
         # start building the graph
         if bootstrap_node:
             self._build_graph()
-            self._check_graph()
+
+    @property
+    def _forward_state(self):
+        """
+        Dynamic state, to record if the node is being forwarded. States of all nodes
+        of a graph are kept in a bytearray of the graph, initially unvisited. Nodes
+        outliving their graph keep the last state (see Graph.__del__).
+        """
+        try:
+            return _forward_states[self._graph._states[self._index]]
+        except ReferenceError:
+            return _forward_states[self._detached_state]
+
+    @_forward_state.setter
+    def _forward_state(self, state):
+        try:
+            self._graph._states[self._index] = state.value
+        except ReferenceError:
+            self._detached_state = state.value
 
     @property
     def _parents(self):
-        return self._graph[self]['parents']
+        return self._graph.parents(self._index)
 
     @property
     def _is_root(self):
-        return self._graph[self]['root']
+        return bool(self._graph.template.roots[self._index])
 
     @property
     def _is_quantum(self):
-        return self._graph[self]['quantum']
+        return bool(self._graph.template.quantum[self._index])
 
     @property
     def _quantum_num(self):
         """ Return number of quantums (layers) of current node """
-        return self._graph[self]['num_layers']
+        return self._graph.template.num_layers[self._index]
 
     @property
     def _quantum_id(self):
         """ Return the order number of current node, start from 0 """
-        return self._graph[self]['layer_id']
+        return self._graph.template.layer_ids[self._index]
 
     def __str__(self):
         return type(self).__name__
 
+    @property
+    def _identity(self):
+        """
+        Identity of the node: (graph id, slot index), which won't change when being
+        weakly referenced, and survives the graph
+        """
+        return self._graph_id, self._index
+
     def __eq__(self, obj):
-        return self._identity == obj._identity
+        if not isinstance(obj, NodeBase):
+            return NotImplemented
+        return self._index == obj._index and self._graph_id == obj._graph_id
+
+    def __hash__(self):
+        return hash((self._graph_id, self._index))
 
     def _ready_to_forward(self):
         """ Return True if meet all dependencies to run current node """
@@ -78,19 +111,33 @@ class NodeBase(object):
 
     def _check_graph(self):
         """
-        check the naming uniqueness of all nodes
+        check the naming uniqueness of all nodes, and index nodes by their names
+        in the graph template (only once per template)
         """
-        node_names = self._traverse_graph(lambda node: str(node), mode='surface')
-        unique_names = set(node_names)
-        if len(unique_names) < len(node_names):
-            raise RuntimeError("Duplicated names found in graph: {}".format(sorted(node_names)))
+        template = self._graph.template
+        if template.name_index is None:
+            node_names = self._traverse_graph(lambda node: str(node), mode='surface')
+            unique_names = set(node_names)
+            if len(unique_names) < len(node_names):
+                raise RuntimeError("Duplicated names found in graph: {}".format(sorted(node_names)))
+            template.name_index = dict(zip(node_names, template.surface))
 
     def _get_clean_lineage(self):
         """
-        Get clean lineage from registry:
+        Get clean lineage of current node class, which is compiled only once
+        until new classes are registered
+        """
+        node_class = type(self)
+        if node_class not in registry._compiled_lineage:
+            registry._compiled_lineage[node_class] = self._compile_lineage()
+        return registry._compiled_lineage[node_class]
+
+    def _compile_lineage(self):
+        """
+        Compile clean lineage from registry:
         Remove unreachable class definition from graph
         """
-        static_lineage = copy.copy(registry._lineage)
+        static_lineage = dict(registry._lineage)
 
         ## 1) add children to node
         children_dict = dict() # {node_class: [child node class, ...]}
@@ -174,65 +221,47 @@ class NodeBase(object):
 
         return static_lineage
 
+    def _get_graph_template(self):
+        """
+        Get the graph template of current node class, which is compiled only once
+        until new classes are registered
+        """
+        node_class = type(self)
+        if node_class not in registry._compiled_template:
+            static_lineage = self._get_clean_lineage()
+            registry._compiled_template[node_class] = GraphTemplate(static_lineage, node_class)
+        return registry._compiled_template[node_class]
+
     def _build_graph(self):
         """
         Build the whole graph by creating node instances and put them under the
-        management of _graph
+        management of _graph. In lazy mode (see lazy_graph), only the bootstrap node
+        is created, other nodes are created once accessed.
         """
-        ## 1) collect graph infos
-        static_lineage = self._get_clean_lineage()
-        class2info = dict()
-        for node_class, parent_list in static_lineage.items():
-            class2info[node_class] = dict()
-            num_layers = 1 if len(parent_list) == 0 else len(parent_list[0])
-            class2info[node_class]['num_layers'] = num_layers
-            class2info[node_class]['node_layers'] = [node_class(bootstrap_node=False) for _ in range(num_layers)]
-            # replace the first layer if node_class is current node
-            if isinstance(self, node_class):
-                class2info[node_class]['node_layers'][0] = weakref.proxy(self)
-
-        ## 2) connect parents in class2info
-        for node_class, parent_list in static_lineage.items():
-            node_info = class2info[node_class]
-            if 'parents' not in node_info:
-                node_info['parents'] = [[] for _ in range(len(parent_list))]
-            for layer_id in range(node_info['num_layers']):
-                for parent_id, parent_group in enumerate(parent_list):
-                    parent_class, parent_layer_id = parent_group[layer_id]
-                    parent_info = class2info[parent_class]
-                    node_info['parents'][parent_id].append(parent_info['node_layers'][parent_layer_id])
-
-        ## 3) create variable _graph as a dictionary: 
-        # {
-        #   node instance: {
-        #       'class': NodeType, 'parents': [...],
-        #       'num_layers': int, 'layer_id': int,
-        #       'quantum': bool, 'root': bool
-        #   }
-        # }
-        graph = Graph()
-        for node_class, node_info in class2info.items():
-            for layer_id, node in enumerate(node_info['node_layers']):
-                graph[node] = {
-                    'class': node_class,
-                    'node': node,
-                    'parents': [],
-                    'num_layers': len(node_info['node_layers']),
-                    'layer_id': layer_id,
-                    'quantum': node_info['num_layers'] > 1,
-                    'root': len(node_info['parents']) == 0,
-                }
-                for parent_groups in node_info['parents']:
-                    graph[node]['parents'].append(parent_groups[layer_id])
-
-        ## 4) broadcast _graph to every existing node (nodes weakly link to graph)
-        for node in graph.nodes():
-            if node == self:
-                node._graph = graph
-            else:
-                node._graph = weakref.proxy(graph)
-
-        ## 5) initialize all graphs
+        ## 1) create node instances on the slots of the graph template
+        template = self._get_graph_template()
+        # the first graph of a template is always complete, to check all nodes
+        lazy = self.lazy_graph and template.name_index is not None
+        nodes = [
+            weakref.ref(self) if index == template.bootstrap_index else
+            None if lazy else node_class(bootstrap_node=False)
+            for index, node_class in enumerate(template.classes)
+        ]
+        graph = Graph(template, nodes)
+
+        ## 2) broadcast _graph to every existing node (nodes weakly link to graph)
+        for index, node in enumerate(nodes):
+            if index == template.bootstrap_index:
+                node = self
+            if node is not None:
+                node._index = index
+                node._graph = graph._proxy
+                node._graph_id = graph.id
+        self._graph = graph
+        # names are indexed before nodes are initialized, which may look up nodes
+        self._check_graph()
+
+        ## 3) initialize all graphs
         for node in graph.nodes():
             node._initialize_node()
 
@@ -240,57 +269,266 @@ class NodeBase(object):
         # root doesn't need forward
         return self._is_root
 
+    @classmethod
+    def forward_batch(cls, nodes):
+        """
+        Forward nodes of current class from a batch of graphs (see GraphBatch) at once,
+        override it to process data of all nodes together (e.g. over stacked arrays).
+        By default forward() of each node is run.
+
+        Args:
+            nodes: list of nodes of current class, one node per graph, all ready to forward
+
+        Return:
+            a list of booleans, the mask of nodes forwarded successfully
+        """
+        return [node.forward() for node in nodes]
+
     def backward(self):
         return False
 
     def _run_forward(self):
         if self._forward_state == ForwardState.unvisited:
+            cache_miss = self._lookup_forward_cache()
+            if self._forward_state != ForwardState.unvisited:
+                return  # settled by the forward cache
+
+            if observers:
+                success = observe(self, 'forward', self._call_forward)
+            else:
+                success = self._call_forward()
+            self._settle_forward(success)
+
+            if cache_miss is not None:
+                self._store_forward_cache(*cache_miss)
+
+    async def _arun_forward(self, executor=None):
+        """
+        Run forward method inside an event loop. Coroutine forward methods are awaited,
+        plain ones are run in executor if given, or inline otherwise.
+        """
+        if self._forward_state == ForwardState.unvisited:
+            cache_miss = self._lookup_forward_cache()
+            if self._forward_state != ForwardState.unvisited:
+                return  # settled by the forward cache
+
+            if observers:
+                success = await aobserve(self, 'forward', lambda: self._acall_forward(executor))
+            else:
+                success = await self._acall_forward(executor)
+            self._settle_forward(success)
+
+            if cache_miss is not None:
+                self._store_forward_cache(*cache_miss)
+
+    def _call_forward(self):
+        success = self.forward()
+        if hasattr(success, '__await__'):
+            success = self._run_coroutine(success)
+        return success
+
+    async def _acall_forward(self, executor=None):
+        if executor is None:
             success = self.forward()
-            if success not in [True, False]:
-                raise RuntimeError(
-                    "{} forward() should return either 'True' or 'False', "
-                    "while it returns: {}".format(type(self), success)
-                )
+        else:
+            import asyncio
+            success = await asyncio.get_running_loop().run_in_executor(executor, self.forward)
+        if hasattr(success, '__await__'):
+            success = await success
+        return success
+
+    def _lookup_forward_cache(self):
+        """
+        Look up the forward cache of node class (see cache_forward), the forward
+        state is settled on a hit.
+
+        Return:
+            (cache key, attributes before forward) on a miss, to store the forward
+            result later, or None otherwise
+        """
+        cache = self._forward_cache
+        if cache is None:
+            return None
+        key = cache.key(self)
+        if key is None:
+            return None
+
+        entry = cache.get(key)
+        if entry is None:
+            return key, dict(vars(self))
+        success, attributes = entry
+        vars(self).update(attributes)
+        self._settle_forward(success)
+        return None
+
+    def _store_forward_cache(self, key, attributes_before):
+        """
+        Store attributes set by forward method to the forward cache of node class
+        """
+        attributes = {
+            name: val for name, val in vars(self).items()
+            if name not in attributes_before or attributes_before[name] is not val
+        }
+        self._forward_cache.put(key, self._forward_state == ForwardState.success, attributes)
+
+    def _run_coroutine(self, coroutine):
+        """
+        Run the coroutine returned by an async forward method outside of event loops
+        """
+        import asyncio
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            async def _await():
+                return await coroutine
+            return asyncio.run(_await())
+        else:
+            if hasattr(coroutine, 'close'):
+                coroutine.close()
+            raise RuntimeError(
+                "{} forward() is a coroutine, which can not be run by seek() inside "
+                "a running event loop, use aseek() instead".format(type(self))
+            )
+
+    def _settle_forward(self, success):
+        if success not in [True, False]:
+            raise RuntimeError(
+                "{} forward() should return either 'True' or 'False', "
+                "while it returns: {}".format(type(self), success)
+            )
+        else:
+            if success:
+                self._forward_state = ForwardState.success
             else:
-                if success:
-                    self._forward_state = ForwardState.success
-                else:
-                    self._forward_state = ForwardState.failure
+                self._forward_state = ForwardState.failure
 
-    def _forward_to_node(self, node):
+    def _forward_to_node(self, node, explored=None):
         """
-        Run a sequence of forward methods towards the target node (included)
+        Run a sequence of forward methods towards the target node (included).
+        Ancestors are explored depth-first in the order of parents with an explicit
+        stack, so the depth of the graph is not limited by recursion.
+
+        Args:
+            - node: the target node
+            - explored: slot indices of nodes explored in the current run. A node stays
+            unvisited after being explored only if it can not run during this run, so it
+            is never explored twice.
         """
-        if node._forward_state == ForwardState.unvisited:
-            ## 1) run forward to its parent
-            for parent in node._parents:
-                self._forward_to_node(parent)
+        if explored is None:
+            explored = set()
+        if node._forward_state != ForwardState.unvisited or node._index in explored:
+            return
+        explored.add(node._index)
+
+        # stack of [node, parents of node, number of explored parents]
+        stack = [[node, node._parents, 0]]
+        while len(stack) > 0:
+            frame = stack[-1]
+            node, parents, num_explored = frame
+
+            # NOTE: the following if-statement is not indespensible
+            # in case of NodeMI, knowing bad news sooner might save computational resources
+            if num_explored > 0 and node._forbidden_forwarding():
+                stack.pop()
 
-                # NOTE: the following if-statement is not indespensible
-                # in case of NodeMI, knowing bad news sooner might save computational resources
-                if node._forbidden_forwarding(): return
+            ## 1) run forward to its parent
+            elif num_explored < len(parents):
+                frame[2] += 1
+                parent = parents[num_explored]
+                if parent._forward_state == ForwardState.unvisited and parent._index not in explored:
+                    explored.add(parent._index)
+                    stack.append([parent, parent._parents, 0])
 
             ## 2) run forward if node meets all dependencies to run
-            if node._ready_to_forward():
-                node._run_forward()
+            else:
+                stack.pop()
+                if node._ready_to_forward():
+                    node._run_forward()
 
-    def seek(self, node_name:str):
+    def seek(self, node_name:str, executor=None):
         """
         reach node by executing series of forward() methods.
         NOTE: unlike method retr(), seek() can start from any node
 
         Args:
             node_name: a string, name of the node to return
+            executor: optional concurrent.futures.Executor (e.g. ThreadPoolExecutor),
+                independent branches are forwarded concurrently on it if given
 
         Return:
             the node object with the node_name
         """
         target_node = self[node_name]
-        self._forward_to_node(target_node)
+        if executor is None:
+            self._forward_to_node(target_node)
+        else:
+            forward_concurrently([target_node], executor)
+        return target_node if target_node._forward_state == ForwardState.success else None
+
+    def seek_many(self, node_names, executor=None):
+        """
+        reach several nodes at once. The union of their ancestors is explored only
+        once, so every node on the way is executed at most once in dependency order.
+
+        Args:
+            node_names: list of node names
+            executor: optional concurrent.futures.Executor, see seek()
+
+        Return:
+            a dictionary {node name: node object, or None if the node is not reached}
+        """
+        target_nodes = [self[node_name] for node_name in node_names]
+        if executor is None:
+            explored = set()
+            for target_node in target_nodes:
+                self._forward_to_node(target_node, explored)
+        else:
+            forward_concurrently(target_nodes, executor)
+        return {
+            str(node): node if node._forward_state == ForwardState.success else None
+            for node in target_nodes
+        }
+
+    def seek_leaves(self, predicate=None, executor=None):
+        """
+        reach all leaf nodes (nodes without children) at once, see seek_many()
+
+        Args:
+            predicate: optional callable that receives a leaf node, only leaves
+                it returns True for are reached
+            executor: optional concurrent.futures.Executor, see seek()
+
+        Return:
+            a dictionary {node name: node object, or None if the node is not reached}
+        """
+        leaf_nodes = [self._graph.node(index) for index in self._graph.template.leaves]
+        if predicate is not None:
+            leaf_nodes = [node for node in leaf_nodes if predicate(node)]
+        return self.seek_many(leaf_nodes, executor)
+
+    async def aseek(self, node_name:str, executor=None):
+        """
+        reach node by executing series of forward() methods inside the running event loop.
+        Forward methods can be coroutines (async def forward), nodes ready at the same
+        time are run concurrently.
+
+        Args:
+            node_name: a string, name of the node to return
+            executor: optional concurrent.futures.Executor to run plain (non-coroutine)
+                forward methods, which block the event loop otherwise
+
+        Return:
+            the node object with the node_name
+        """
+        target_node = self[node_name]
+        await forward_asynchronously([target_node], executor)
         return target_node if target_node._forward_state == ForwardState.success else None
 
     def _run_backward(self):
-        success = self.backward()
+        if observers:
+            success = observe(self, 'backward', self.backward)
+        else:
+            success = self.backward()
         if success not in [True, False]:
             raise RuntimeError(
                 "{} backward() should return either 'True' or 'False', "
@@ -301,26 +539,34 @@ class NodeBase(object):
 
     def _backward_from_node(self, source_node, target_node=None):
         """
-        Run a sequence of backwards methods from node towards the target node (node_name)
-        """
-        # reach target node (by comparing the node name)
-        # if retr from a quantum node to another quantum node
-        # node name matching is enough to secure reaching the target
-        # because routing in quantum space is automatic
-        if target_node and str(source_node) == str(target_node):
-            return source_node
-
-        # keep scanning upwards
-        elif source_node._run_backward():
-            reached_node = None
-            for parent in source_node._parents:
-                # backward is executed only if the node is executed and successful
-                if parent._forward_state == ForwardState.success:
-                    source_node = self._backward_from_node(parent, target_node)
-                    if source_node:
-                        reached_node = source_node
-            return reached_node
-        return None
+        Run a sequence of backwards methods from node towards the target node (node_name).
+        Ancestors are scanned depth-first in the order of parents with an explicit stack,
+        the target reached at last is returned.
+        """
+        target_name = str(target_node) if target_node else None
+        reached_node = None
+
+        # stack of (node, whether node is a parent of a scanned node)
+        stack = [(source_node, False)]
+        while len(stack) > 0:
+            node, is_parent = stack.pop()
+
+            # backward is executed only if the node is executed and successful
+            if is_parent and node._forward_state != ForwardState.success:
+                continue
+
+            # reach target node (by comparing the node name)
+            # if retr from a quantum node to another quantum node
+            # node name matching is enough to secure reaching the target
+            # because routing in quantum space is automatic
+            if target_name and str(node) == target_name:
+                reached_node = node
+
+            # keep scanning upwards
+            elif node._run_backward():
+                stack.extend((parent, True) for parent in reversed(node._parents))
+
+        return reached_node
 
     def retr(self, node_name:str=None):
         """
@@ -335,6 +581,73 @@ class NodeBase(object):
         target_node = self[node_name] if node_name else None
         return self._backward_from_node(self, target_node)
 
+    def critical_path(self, node_name, timings):
+        """
+        Compute the critical path towards a node from timings of forward runs: the
+        chain of nodes gating the target when every node runs as soon as its parents
+        allow it. Only nodes that ran (found in timings) cost their mean forward time.
+
+        A node is gated by its latest finishing parent that ran, as nodes (NodeCI
+        included) are forwarded once all their explored parents are settled. Semantics
+        of node types only decide which nodes ran.
+
+        Args:
+            - node_name: name of the target node
+            - timings: a Profiler, its stats(), or {node name: mean forward time in seconds}
+
+        Return:
+            {
+                'path': [node, ...] from a root to the target,
+                'length': total cost of the path in seconds,
+                'work': total cost of ancestors of the target (included) in seconds,
+                'speedup': work / length, the speedup of parallel execution at most,
+            }
+        """
+        stats = timings.stats() if hasattr(timings, 'stats') else timings
+        costs = {name: x['wall_mean'] if isinstance(x, dict) else x for name, x in stats.items()}
+
+        graph = self._graph
+        target = self[node_name]
+
+        ## 1) order ancestors of the target, parents first
+        order, visited = list(), set()
+        stack = [(target._index, False)]
+        while len(stack) > 0:
+            index, expanded = stack.pop()
+            if expanded:
+                order.append(index)
+            elif index not in visited:
+                visited.add(index)
+                stack.append((index, True))
+                stack.extend((parent_index, False) for parent_index in graph.template.parents(index))
+
+        ## 2) earliest finish time of each node, and its gating parent
+        finish, gate = dict(), dict()
+        for index in order:
+            node = graph.node(index)
+            parent_indices = graph.template.parents(index)
+            ran = [i for i in parent_indices if str(graph.node(i)) in costs]
+            candidates = ran if len(ran) > 0 else parent_indices
+            gate[index] = max(candidates, key=lambda i: finish[i], default=None)
+            start = 0. if gate[index] is None else finish[gate[index]]
+            finish[index] = start + costs.get(str(node), 0.)
+
+        ## 3) walk gating parents back from the target
+        path, index = list(), target._index
+        while index is not None:
+            path.append(graph.node(index))
+            index = gate[index]
+        path.reverse()
+
+        length = finish[target._index]
+        work = sum(costs.get(str(graph.node(index)), 0.) for index in order)
+        return {
+            'path': path,
+            'length': length,
+            'work': work,
+            'speedup': work / length if length > 0 else 1.,
+        }
+
     def _traverse_graph(self, callback, mode: str):
         """
         traverse the graph and execute call_back at each node (with random order)
@@ -348,13 +661,11 @@ class NodeBase(object):
             a dictionary of returning results: {str(node): callback(node) return}
         """
         assert mode in ['surface', 'complete']
-        node_set = list()
         ## 1) Collect all node instances
-        for node, node_info in self._graph.items():
-            if mode == 'surface' and node_info['layer_id'] > 0:
-                continue
-            else:
-                node_set.append(node)
+        if mode == 'surface':
+            node_set = [self._graph.node(index) for index in self._graph.template.surface]
+        else:
+            node_set = [self._graph.node(index) for index in range(len(self._graph))]
 
         ## 2) Execute results
         assert callable(callback), "The input must be a callable funciton."
@@ -365,11 +676,10 @@ class NodeBase(object):
         if isinstance(node_name, NodeBase):
             return node_name
 
-        # get representatives of all nodes: their first layer
-        all_nodes = self._traverse_graph(lambda node: node, mode='surface')
-        for node in all_nodes:
-            if str(node) == node_name:
-                return node
+        # names are indexed to representatives of all nodes: their first layer
+        index = self._graph.template.name_index.get(node_name)
+        if index is not None:
+            return self._graph.node(index)
         raise RuntimeError("Can not find node named '{}' in graph".format(node_name))
 
     def broadcast(self, message):
@@ -385,6 +695,20 @@ class NodeBase(object):
         """
         return self._traverse_graph(callback, mode='surface')
 
+    def reset(self):
+        """
+        Reset the graph to the state right after it is built: forward states, node
+        outputs and broadcasting messages are cleared, while the topology is kept,
+        so the graph can process new data.
+        """
+        for node in self._graph.nodes():
+            vars(node).clear()
+        self._graph.reset_states()
+        self._graph._notice_board.clear()
+
+        for node in self._graph.nodes():
+            node._initialize_node()
+
     @property
     def broadcasting(self):
         return self._graph._notice_board
@@ -424,55 +748,59 @@ class NodeBase(object):
         else:
             return {}
 
-    def draw_graph(self, splines='curved'):
-        g = Digraph('G', filename='graph')
-        g.attr('node', shape='box')
-
-        legal_edge_styles = ['line', 'curved', 'spline', 'polyline', 'ortho']
-        assert splines in legal_edge_styles, \
-            "'splines' must be one of the following style: {}".format(legal_edge_styles)
-
-        g.graph_attr['splines'] = splines
-
-        # collect nodes and edges
-        nodes, edges = dict(), dict()
-        all_nodes = self._traverse_graph(lambda node: node, mode='complete')
-        nodepi_parents = dict()  # Dictionary to store NodePI nodes and their parents
-        for node in all_nodes:
-            nodes[str(node)] = self._get_node_attribute(node)
-            if isinstance(node, NodePI):  # Assuming NodePI is a specific class
-                parent_ids = tuple(sorted([str(parent) for parent in node._parents]))
-                nodepi_parents.setdefault(parent_ids, []).append(node)
-                continue
-            for parent_id, parent in enumerate(node._parents):
-                edges[(str(parent), str(node), parent_id)] = self._get_edge_attribute(parent, node)
-
-        # Stacking NodePI nodes with shared parents using invisible edges and surrounding them with a box
-        cluster_count = 0
-        for parent_ids, nodepi_group in nodepi_parents.items():
-            assert len(nodepi_group) > 0
-            with g.subgraph(name='cluster_{}'.format(cluster_count)) as c:
-                c.attr(
-                    label='', style='rounded, filled',
-                    pencolor='lightgrey', color='lightyellow')
-                for node in nodepi_group:
-                    c.node(str(node))
-                for i in range(len(nodepi_group) - 1):
-                    c.edge(str(nodepi_group[i]), str(nodepi_group[i+1]), style='invis')  # Invisible edge
-                # draw edge between parent and first node in nodepi_group
-                first_node = nodepi_group[0]
-                assert len(first_node._parents) == 1
-                parent = first_node._parents[0]
-                edge_attr = self._get_edge_attribute(parent, node)
-                g.edge(str(parent), str(first_node), **edge_attr)
-            cluster_count += 1
-
-        # draw nodes and edges
-        for node_str, node_attr in nodes.items():
-            g.node(node_str, **node_attr)
-        for (parent_str, node_str, _), edge_attr in edges.items():
-            g.edge(parent_str, node_str, **edge_attr)
+    def _get_profile_attribute(self, node, stats, max_wall_mean):
+        """
+        Heatmap style of node from stats of forward runs: the slower on average,
+        the redder. Nodes never run are greyed out.
+        """
+        lines = [str(node)]
+        node_stats = stats.get(str(node))
+        if node_stats is None:
+            node_style = {'fillcolor': 'grey92', 'fontcolor': 'grey50', 'style': 'filled,rounded,dotted'}
+        else:
+            heat = node_stats['wall_mean'] / max_wall_mean if max_wall_mean > 0 else 0.
+            node_style = {'fillcolor': '0 {:.3f} 1'.format(heat), 'fontcolor': 'black'}
+            lines.append('mean {:.2f}ms p95 {:.2f}ms'.format(
+                1e3 * node_stats['wall_mean'], 1e3 * node_stats['wall_p95']))
+            lines.append('calls {} fail {:.0%}'.format(node_stats['calls'], node_stats['failure_rate']))
+        cache = type(node)._forward_cache
+        if cache is not None:
+            lines.append('cache hit {:.0%}'.format(cache.hit_rate))
+        node_style['label'] = '\\n'.join(lines)
+        return node_style
 
+    def _get_profile_edge_attribute(self, parent, child, stats, max_calls):
+        """
+        Heatmap style of edge from stats of forward runs: the more runs of the
+        child, the thicker. Edges to nodes never run are greyed out.
+        """
+        child_stats = stats.get(str(child))
+        if child_stats is None:
+            return {'color': 'grey70', 'style': 'dotted'}
+        return {
+            'label': str(child_stats['calls']),
+            'penwidth': '{:.2f}'.format(1 + 3 * child_stats['calls'] / max_calls),
+        }
+
+    def _build_digraph(self, splines='curved', profile=None):
+        """
+        Build the graphviz Digraph of the flow view, see draw_graph()
+        """
+        # graphviz is only needed to draw graphs, see visual.py
+        from .visual import build_digraph
+        return build_digraph(self, splines, profile)
+
+    def draw_graph(self, splines='curved', profile=None):
+        """
+        Render the flow view of the graph to graph.gv
+
+        Args:
+            - splines: style of edges
+            - profile: optional Profiler (or its stats()) to color and annotate nodes
+            and edges with stats of forward runs: mean/p95 latency, number of calls,
+            failure rate and cache hit rate
+        """
+        g = self._build_digraph(splines, profile)
         g.render(view=False, cleanup=True, format='gv')
 
 
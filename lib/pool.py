@@ -0,0 +1,104 @@
+#
+# Pool of reusable graphs
+#
+import queue
+import threading
+import contextlib
+
+__all__ = ['GraphPool']
+
+
+class GraphPool(object):
+    """
+    Bounded pool of ready graphs, each of which is held by its bootstrap node.
+    Graphs are reset when given back, so the pool always hands out graphs in
+    their freshly built state.
+    """
+    def __init__(self, node_class, maxsize=8):
+        """
+        Args:
+            - node_class: class of the bootstrap node of pooled graphs
+            - maxsize: maximum number of graphs the pool creates
+        """
+        assert maxsize > 0, "maxsize of the pool should be positive"
+        self._node_class = node_class
+        self._maxsize = maxsize
+        self._idle_nodes = queue.LifoQueue()  # reuse the most recently (cache-hot) graph first
+        self._num_created = 0
+        self._checked_out = set()  # ids of bootstrap nodes of graphs in use
+        self._lock = threading.Lock()
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    @property
+    def num_created(self):
+        return self._num_created
+
+    def acquire(self, block=True, timeout=None):
+        """
+        Check out a graph, the bootstrap node is returned. A new graph is created
+        if no idle one is left and the pool is not full, otherwise wait for a
+        graph to be given back.
+        """
+        node = self._get_node(block, timeout)
+        with self._lock:
+            self._checked_out.add(id(node))
+        return node
+
+    def _get_node(self, block, timeout):
+        try:
+            return self._idle_nodes.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            create_graph = self._num_created < self._maxsize
+            if create_graph:
+                self._num_created += 1
+        if create_graph:
+            try:
+                return self._node_class()
+            except:
+                with self._lock:
+                    self._num_created -= 1
+                raise
+
+        try:
+            return self._idle_nodes.get(block, timeout)
+        except queue.Empty:
+            raise RuntimeError("No graph is available in the pool of {}".format(self._node_class))
+
+    def release(self, node):
+        """
+        Give back a graph (by its bootstrap node) checked out by acquire()
+        """
+        assert type(node) is self._node_class, \
+            "{} is not a bootstrap node of the pool".format(node)
+        with self._lock:
+            if id(node) not in self._checked_out:
+                raise RuntimeError("{} is not checked out from the pool, or released twice".format(node))
+            self._checked_out.remove(id(node))
+        try:
+            node.reset()
+        except:
+            # drop the broken graph
+            with self._lock:
+                self._num_created -= 1
+            raise
+        self._idle_nodes.put(node)
+
+    @contextlib.contextmanager
+    def checkout(self, block=True, timeout=None):
+        """
+        Check out a graph within a with-statement:
+
+            with pool.checkout() as root:
+                root.seek('node')
+        """
+        node = self.acquire(block, timeout)
+        try:
+            yield node
+        finally:
+            self.release(node)
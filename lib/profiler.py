@@ -0,0 +1,279 @@
+#
+# Profiling of forward() and backward() methods of nodes
+#
+import os
+import math
+import time
+import itertools
+import threading
+import collections
+
+from .state import ForwardState
+
+__all__ = ['Observer', 'Profiler', 'Tracer', 'observe', 'observers']
+
+
+# active observers of node runs (see Profiler), checked on every run of nodes
+observers = list()
+
+
+def outcome_of(res):
+    """
+    Outcome of a return of forward() or backward(): success or failure for a boolean
+    (numpy booleans included), error for other returns, which nodes reject
+    """
+    try:
+        valid = res in [True, False]
+    except Exception:
+        valid = False
+    if not valid:
+        return ForwardState.error
+    return ForwardState.success if res else ForwardState.failure
+
+
+def observe(node, method, function, outcome_of=outcome_of):
+    """
+    Run function, a forward/backward method of node, and report the run to active
+    observers: observer.record(node, method, start, wall, cpu, outcome), where
+    outcome is a ForwardState given by outcome_of(return) (error if function raises)
+    """
+    outcome = ForwardState.error
+    start, start_cpu = time.perf_counter(), time.thread_time()
+    try:
+        res = function()
+        outcome = outcome_of(res)
+        return res
+    finally:
+        wall, cpu = time.perf_counter() - start, time.thread_time() - start_cpu
+        for observer in list(observers):
+            observer.record(node, method, start, wall, cpu, outcome)
+
+
+async def aobserve(node, method, coroutine_function):
+    """
+    Coroutine version of observe(), CPU time is not measured (None) since other
+    tasks run on the thread in the meantime. Runs are reported with
+    asynchronous=True, as they may overlap on the thread.
+    """
+    outcome = ForwardState.error
+    start = time.perf_counter()
+    try:
+        res = await coroutine_function()
+        outcome = outcome_of(res)
+        return res
+    finally:
+        wall = time.perf_counter() - start
+        for observer in list(observers):
+            observer.record(node, method, start, wall, None, outcome, asynchronous=True)
+
+
+def percentile(sorted_values, q):
+    """
+    Nearest-rank percentile q (0 - 100) of sorted values
+    """
+    if len(sorted_values) == 0:
+        return None
+    rank = math.ceil(q / 100. * len(sorted_values)) - 1
+    return sorted_values[min(max(rank, 0), len(sorted_values) - 1)]
+
+
+class Observer(object):
+    """
+    Base class of observers of node runs, which are active within the context or
+    between start() and stop()
+    """
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        observers.append(self)
+
+    def stop(self):
+        if self in observers:
+            observers.remove(self)
+
+    def record(self, node, method, start, wall, cpu, outcome, asynchronous=False):
+        """
+        Called after each run of a method of node in the running thread, see observe()
+        and aobserve()
+        """
+        raise NotImplementedError()
+
+
+class Profiler(Observer):
+    """
+    Record wall time, CPU time and outcome of forward() and backward() runs of nodes
+    of all graphs while it is active. Runs are aggregated by node name (layers of a
+    quantum node share their name) or by node class:
+
+        with Profiler() as profiler:
+            for image in images:
+                Image.from_array(image).seek('bump')
+        print(profiler.report())
+        profiler.stats()['bump']  # {'calls': ..., 'wall_mean': ..., 'wall_p95': ...}
+
+    Inactive profilers cost a check of an empty list per run.
+    """
+    def __init__(self):
+        # {(node name, class name, method): [(wall, cpu, outcome), ...]}
+        self._records = collections.defaultdict(list)
+        self._lock = threading.Lock()
+
+    def record(self, node, method, start, wall, cpu, outcome, asynchronous=False):
+        key = (str(node), type(node).__name__, method)
+        with self._lock:
+            self._records[key].append((wall, cpu, outcome))
+
+    def merge(self, other):
+        """
+        Add records of another profiler, from another process for instance
+        """
+        with self._lock:
+            for key, records in other._records.items():
+                self._records[key].extend(records)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def __getstate__(self):
+        return {'_records': dict(self._records)}
+
+    def __setstate__(self, state):
+        self._records = collections.defaultdict(list, state['_records'])
+        self._lock = threading.Lock()
+
+    def stats(self, method='forward', by='node'):
+        """
+        Aggregate runs of a method ('forward', 'forward_batch' or 'backward')
+
+        Args:
+            - method: name of the method
+            - by: 'node' to aggregate by node names, or 'class' by node class names
+
+        Return:
+            {node or class name: {
+                'class', 'calls', 'success', 'failure', 'error', 'failure_rate',
+                'wall_total', 'wall_mean', 'wall_p50', 'wall_p95', 'wall_p99',
+                'cpu_total', 'cpu_mean',
+            }}, times are in seconds
+        """
+        assert by in ['node', 'class']
+        groups = collections.defaultdict(list)
+        classes = dict()
+        with self._lock:
+            for (node_name, class_name, record_method), records in self._records.items():
+                if record_method == method:
+                    name = node_name if by == 'node' else class_name
+                    groups[name].extend(records)
+                    classes[name] = class_name
+
+        stats = dict()
+        for name, records in groups.items():
+            walls = sorted(wall for wall, _, _ in records)
+            cpus = [cpu for _, cpu, _ in records if cpu is not None]
+            outcomes = collections.Counter(outcome for _, _, outcome in records)
+            stats[name] = {
+                'class': classes[name],
+                'calls': len(records),
+                'success': outcomes[ForwardState.success],
+                'failure': outcomes[ForwardState.failure],
+                'error': outcomes[ForwardState.error],
+                'failure_rate': (outcomes[ForwardState.failure] + outcomes[ForwardState.error]) / len(records),
+                'wall_total': sum(walls),
+                'wall_mean': sum(walls) / len(walls),
+                'wall_p50': percentile(walls, 50),
+                'wall_p95': percentile(walls, 95),
+                'wall_p99': percentile(walls, 99),
+                'cpu_total': sum(cpus) if len(cpus) > 0 else None,
+                'cpu_mean': sum(cpus) / len(cpus) if len(cpus) > 0 else None,
+            }
+        return stats
+
+    def report(self, method='forward', by='node'):
+        """
+        Return a table of stats (see stats()), sorted by total wall time
+        """
+        stats = self.stats(method, by)
+        lines = ['{:<24} {:>7} {:>8} {:>10} {:>10} {:>10} {:>10}'.format(
+            by, 'calls', 'fail%', 'total ms', 'mean ms', 'p95 ms', 'cpu ms')]
+        for name, x in sorted(stats.items(), key=lambda item: -item[1]['wall_total']):
+            lines.append('{:<24} {:>7} {:>8.1f} {:>10.3f} {:>10.3f} {:>10.3f} {:>10}'.format(
+                name, x['calls'], 100 * x['failure_rate'], 1e3 * x['wall_total'],
+                1e3 * x['wall_mean'], 1e3 * x['wall_p95'],
+                '-' if x['cpu_total'] is None else '{:.3f}'.format(1e3 * x['cpu_total'])))
+        return '\n'.join(lines)
+
+
+class Tracer(Observer):
+    """
+    Record a span per forward() and backward() run of nodes while it is active, in
+    the Chrome trace event format, which loads in Perfetto (ui.perfetto.dev) or
+    chrome://tracing offline. Spans of concurrent runs overlap on their threads.
+    Runs of coroutines (see aseek) interleave on the thread of the event loop, so
+    they are recorded as async spans, each on its own track:
+
+        with Tracer() as tracer:
+            root.seek('bump', executor=executor)
+        tracer.save('trace.json')
+    """
+    def __init__(self):
+        self._events = list()
+        self._thread_names = dict()  # {thread id: thread name}
+        self._origin = time.perf_counter()
+        self._span_ids = itertools.count()  # ids of async spans
+        self._lock = threading.Lock()
+
+    def record(self, node, method, start, wall, cpu, outcome, asynchronous=False):
+        thread = threading.current_thread()
+        event = {
+            'name': str(node), 'cat': method, 'ph': 'X',
+            'ts': 1e6 * (start - self._origin), 'dur': 1e6 * wall,
+            'pid': os.getpid(), 'tid': thread.ident,
+            'args': {
+                'class': type(node).__name__,
+                'layer_id': node._quantum_id,
+                'result': outcome.name,
+            },
+        }
+        if cpu is not None:
+            event['args']['cpu_ms'] = 1e3 * cpu
+        if asynchronous:
+            # a pair of begin/end events with the id of the span
+            event['ph'], event['id'] = 'b', next(self._span_ids)
+            end_event = {key: event[key] for key in ['name', 'cat', 'pid', 'tid', 'id']}
+            end_event.update({'ph': 'e', 'ts': event['ts'] + event.pop('dur')})
+            events = [event, end_event]
+        else:
+            events = [event]
+        with self._lock:
+            self._events.extend(events)
+            self._thread_names[thread.ident] = thread.name
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+            self._thread_names.clear()
+
+    def events(self):
+        """
+        Return the list of trace events, including thread names
+        """
+        with self._lock:
+            metadata = [
+                {'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid, 'args': {'name': name}}
+                for tid, name in self._thread_names.items()
+            ]
+            return metadata + list(self._events)
+
+    def save(self, path):
+        """
+        Save the trace as a JSON file
+        """
+        import json
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': self.events(), 'displayTimeUnit': 'ms'}, f)
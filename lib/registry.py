@@ -1,12 +1,72 @@
 #
 # Class to manage the node graph construction
 #
+import os
+import weakref
+import functools
+import threading
+import collections
+
+from .cache import sizeof as cache_sizeof
+
 __all__ = ['registry', 'hook_parent']
 
 
+class Lineage(dict):
+    """
+    Class lineage {node_class: formated_parent_list}, which drops the compiled
+    topologies of its registry whenever it is modified
+    """
+    def __init__(self, on_change):
+        super().__init__()
+        self._on_change = on_change
+
+    def __setitem__(self, key, val):
+        super().__setitem__(key, val)
+        self._on_change()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._on_change()
+
+    def pop(self, *args):
+        res = super().pop(*args)
+        self._on_change()
+        return res
+
+    def popitem(self):
+        res = super().popitem()
+        self._on_change()
+        return res
+
+    def setdefault(self, key, default=None):
+        res = super().setdefault(key, default)
+        self._on_change()
+        return res
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._on_change()
+
+    def clear(self):
+        super().clear()
+        self._on_change()
+
+
 class Registry(object):
     def __init__(self):
-        self._lineage = dict()
+        self._lineage = Lineage(self.invalidate)
+        # compiled lineages of bootstrap classes: {node_class: clean lineage}
+        self._compiled_lineage = dict()
+        # compiled graph templates of bootstrap classes: {node_class: GraphTemplate}
+        self._compiled_template = dict()
+
+    def invalidate(self):
+        """
+        Drop all compiled topologies, they are re-derived on next graph creation
+        """
+        self._compiled_lineage.clear()
+        self._compiled_template.clear()
 
     @staticmethod
     def parse_hooked_parents(parent_class_list):
@@ -61,18 +121,145 @@ class Registry(object):
 
 
 class StaticModuleManager(object):
-    def __init__(self):
-        self._static_function_returns = dict()
+    """
+    Cache of returns of static initializers, shared by the whole process. Returns
+    are cached by initializer and key, least recently used returns are evicted once
+    their total size exceeds maxbytes.
+    """
+    def __init__(self, maxbytes=None, reset_after_fork=True):
+        """
+        Args:
+            - maxbytes: optional maximum memory size of cached returns (see cache.sizeof)
+            - reset_after_fork: drop cached returns in forked child processes, since
+            loaded resources (threads, file handles, devices) may not survive forks
+        """
+        self.maxbytes = maxbytes
+        self.reset_after_fork = reset_after_fork
+        self._static_function_returns = collections.OrderedDict()  # {(func_id, key): (return, nbytes)}
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self._loading_locks = dict()  # {(func_id, key): lock}
+
+        # locks may be held by other threads at fork, renew them in the child
+        manager_ref = weakref.ref(self)
+        def _after_fork_in_child():
+            manager = manager_ref()
+            if manager is not None:
+                manager._after_fork()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=_after_fork_in_child)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+        self._loading_locks = dict()
+        if self.reset_after_fork:
+            self._static_function_returns = collections.OrderedDict()
+            self._nbytes = 0
+
+    def static_initializer(self, func=None, key=None, sizeof=None):
+        """
+        Decorator of (usually expensive) initializers, whose returns are cached for the
+        whole process. By default, the first return is cached regardless of arguments:
 
-    def static_initializer(self, func):
+            @static_initializer
+            def initialize_model(self):
+                ...
+
+        A key function of the arguments caches one return per key:
+
+            @static_initializer(key=lambda self, variant: variant)
+            def initialize_model(self, variant):
+                ...
+
+        Concurrent calls of the same key load only once. Cached returns of an
+        initializer are dropped by initialize_model.release(*args, **kwargs), or all
+        of them by initialize_model.release_all().
+
+        Args:
+            - key: optional callable key(*args, **kwargs) returning a hashable key
+            - sizeof: optional callable sizeof(return) estimating memory size of a
+            return, for eviction by maxbytes (see cache.sizeof)
+        """
+        if func is None:
+            return functools.partial(self.static_initializer, key=key, sizeof=sizeof)
+
+        func_id = id(func)
+
+        def _entry_key(args, kwargs):
+            return (func_id, None if key is None else key(*args, **kwargs))
+
+        @functools.wraps(func)
         def method_decorator(*args, **kwargs):
-            func_id = id(func)
-            if func_id not in self._static_function_returns:
+            entry_key = _entry_key(args, kwargs)
+            found, res = self._lookup(entry_key)
+            if found:
+                return res
+            with self._loading_lock(entry_key):
+                # loaded by another thread in the meantime
+                found, res = self._lookup(entry_key)
+                if found:
+                    return res
                 res = func(*args, **kwargs)
-                self._static_function_returns[func_id] = res
-            return self._static_function_returns[func_id]
+                self._store(entry_key, res, (sizeof or cache_sizeof)(res))
+            return res
+
+        def release(*args, **kwargs):
+            self.release(_entry_key(args, kwargs))
+
+        def release_all():
+            self.release(lambda entry_key: entry_key[0] == func_id)
+
+        method_decorator.release = release
+        method_decorator.release_all = release_all
+        method_decorator.__static_initializer__ = True
+        method_decorator.keyed = key is not None
         return method_decorator
 
+    def _lookup(self, entry_key):
+        with self._lock:
+            entry = self._static_function_returns.get(entry_key)
+            if entry is None:
+                return False, None
+            self._static_function_returns.move_to_end(entry_key)
+            return True, entry[0]
+
+    def _loading_lock(self, entry_key):
+        with self._lock:
+            return self._loading_locks.setdefault(entry_key, threading.Lock())
+
+    def _store(self, entry_key, res, nbytes):
+        with self._lock:
+            self._static_function_returns[entry_key] = (res, nbytes)
+            self._nbytes += nbytes
+            self._loading_locks.pop(entry_key, None)
+            # evict least recently used returns, but the one just loaded
+            while self.maxbytes is not None and self._nbytes > self.maxbytes and \
+                    len(self._static_function_returns) > 1:
+                _, (_, evicted_nbytes) = self._static_function_returns.popitem(last=False)
+                self._nbytes -= evicted_nbytes
+
+    def release(self, entry_key=None):
+        """
+        Drop cached returns: all of them by default, the one of an entry key
+        (func_id, key), or the ones whose entry keys satisfy a predicate
+        """
+        with self._lock:
+            if entry_key is None:
+                entry_keys = list(self._static_function_returns)
+            elif callable(entry_key):
+                entry_keys = [x for x in self._static_function_returns if entry_key(x)]
+            else:
+                entry_keys = [entry_key] if entry_key in self._static_function_returns else []
+            for x in entry_keys:
+                self._nbytes -= self._static_function_returns.pop(x)[1]
+
+    def __len__(self):
+        return len(self._static_function_returns)
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
 
 registry = Registry()
 hook_parent = registry.hook_parent
@@ -0,0 +1,222 @@
+#
+# Execution of graphs over streams of inputs
+#
+import os
+import itertools
+import collections
+
+from .pool import GraphPool
+from .warmup import warm_up as warm_up_static_initializers
+
+__all__ = ['GraphRunner', 'Pipeline', 'collect_attributes']
+
+
+def collect_attributes(node):
+    """
+    Default collector of node results: public attributes of the node
+    """
+    return {key: val for key, val in vars(node).items() if not key.startswith('_')}
+
+
+def bounded_map(executor, function, inputs, window, ordered=True):
+    """
+    Map function over inputs on executor lazily, with at most window inputs in flight.
+
+    Return:
+        a generator of results in the order of inputs if ordered, or a generator of
+        (input index, result) in the order of completion otherwise
+    """
+    assert window > 0, "window should be positive"
+    if ordered:
+        return _bounded_map_ordered(executor, function, iter(inputs), window)
+    else:
+        return _bounded_map_unordered(executor, function, enumerate(inputs), window)
+
+
+def _bounded_map_ordered(executor, function, inputs, window):
+    futures = collections.deque()
+    try:
+        for datum in itertools.islice(inputs, window):
+            futures.append(executor.submit(function, datum))
+        while len(futures) > 0:
+            result = futures.popleft().result()
+            # keep the executor busy while the result is consumed
+            for datum in itertools.islice(inputs, 1):
+                futures.append(executor.submit(function, datum))
+            yield result
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def _bounded_map_unordered(executor, function, indexed_inputs, window):
+    import concurrent.futures
+    futures = dict()  # {future: input index}
+    try:
+        for index, datum in itertools.islice(indexed_inputs, window):
+            futures[executor.submit(function, datum)] = index
+        while len(futures) > 0:
+            done, _ = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
+            results = [(futures.pop(future), future) for future in done]
+            for index, datum in itertools.islice(indexed_inputs, len(done)):
+                futures[executor.submit(function, datum)] = index
+            for index, future in results:
+                yield index, future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+# graph and settings of the current worker process of GraphRunner
+_worker = dict()
+
+
+def _initialize_worker(node_class, targets, feed, collect, warm_up):
+    root = node_class()
+    if warm_up is True:
+        warm_up_static_initializers(node_class)
+    elif warm_up is not None:
+        warm_up(root)
+    _worker.update(root=root, targets=targets, feed=feed, collect=collect)
+
+
+def _run_worker(datum):
+    root = _worker['root']
+    root.reset()
+    _worker['feed'](root, datum)
+    nodes = root.seek_many(_worker['targets'])
+    collect = _worker['collect']
+    return {name: None if node is None else collect(node) for name, node in nodes.items()}
+
+
+class GraphRunner(object):
+    """
+    Run graphs of a bootstrap class over a stream of inputs on a pool of processes.
+    Each worker process builds its graph once and reuses it for all of its inputs
+    (see NodeBase.reset()), so caches of static initializers are also warmed once
+    per process. Only collected results of target nodes are sent back, which should
+    be picklable. So are node_class, feed, collect and warm_up unless processes are
+    forked.
+
+        with GraphRunner(Root, ['worker-a', 'worker-b'], feed) as runner:
+            for result in runner.imap(images):
+                ...  # {'worker-a': collect(node) or None, 'worker-b': ...}
+    """
+    def __init__(self, node_class, targets, feed, collect=collect_attributes,
+                 warm_up=None, max_workers=None, window=None, mp_context=None):
+        """
+        Args:
+            - node_class: class of the bootstrap node
+            - targets: names of nodes to seek for each input
+            - feed: callable feed(bootstrap_node, datum) to put a datum into the graph
+            - collect: callable collect(node) to return results of a reached target node
+            - warm_up: optional callable warm_up(bootstrap_node), called once per process,
+            or True to preload static initializers of the graph (see warmup.warm_up)
+            - max_workers: number of worker processes, number of CPUs by default
+            - window: maximum number of inputs in flight, 2 * max_workers by default
+            - mp_context: optional multiprocessing context of worker processes
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._window = window or 2 * self._max_workers
+        self._executor = ProcessPoolExecutor(
+            max_workers=self._max_workers, mp_context=mp_context,
+            initializer=_initialize_worker,
+            initargs=(node_class, list(targets), feed, collect, warm_up),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def imap(self, inputs):
+        """
+        Return a generator of results of inputs, in the order of inputs
+        """
+        return bounded_map(self._executor, _run_worker, inputs, self._window, ordered=True)
+
+    def imap_unordered(self, inputs):
+        """
+        Return a generator of (input index, result), in the order of completion
+        """
+        return bounded_map(self._executor, _run_worker, inputs, self._window, ordered=False)
+
+    def map(self, inputs):
+        """
+        Return the list of results of inputs
+        """
+        return list(self.imap(inputs))
+
+
+class Pipeline(object):
+    """
+    Stream inputs through reusable graphs of a bootstrap class in the current process,
+    with a bounded number of inputs in flight: inputs are pulled from the stream only
+    when results are consumed, so memory stays flat on endless streams.
+
+        pipeline = Pipeline(Root, ['worker-a', 'worker-b'], feed)
+        for result in pipeline.stream(frames, prefetch=8):
+            ...  # {'worker-a': node or None, 'worker-b': ...}
+    """
+    def __init__(self, node_class, targets, feed, executor=None):
+        """
+        Args:
+            - node_class: class of the bootstrap node
+            - targets: names of nodes to seek for each input
+            - feed: callable feed(bootstrap_node, datum) to put a datum into the graph
+            - executor: optional concurrent.futures.Executor running graphs of inputs in flight,
+            a thread pool of prefetch threads is used by default
+        """
+        self._node_class = node_class
+        self._targets = list(targets)
+        self._feed = feed
+        self._executor = executor
+
+    def stream(self, inputs, prefetch=8):
+        """
+        Return a generator of results of inputs, in the order of inputs. A result is a
+        dictionary {node name: node object or None} of the target nodes.
+
+        NOTE: graphs are pooled, the graph of a result is reset and reused once the next
+        result is requested. Keep what you need from nodes before moving on.
+
+        Args:
+            inputs: iterable of data
+            prefetch: maximum number of inputs processed ahead of the consumed result
+        """
+        assert prefetch > 0, "prefetch should be positive"
+        # graphs in flight, the one being consumed and the one just released
+        pool = GraphPool(self._node_class, maxsize=prefetch + 2)
+
+        def _run(datum):
+            root = pool.acquire()
+            try:
+                self._feed(root, datum)
+                return root, root.seek_many(self._targets)
+            except:
+                pool.release(root)
+                raise
+
+        executor = self._executor
+        if executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            executor = ThreadPoolExecutor(max_workers=prefetch)
+
+        consumed_root = None
+        try:
+            for root, nodes in bounded_map(executor, _run, inputs, prefetch):
+                if consumed_root is not None:
+                    pool.release(consumed_root)
+                consumed_root = root
+                yield nodes
+        finally:
+            if consumed_root is not None:
+                pool.release(consumed_root)
+            if self._executor is None:
+                executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,176 @@
+#
+# Dataflow scheduling of forward() methods, to run independent nodes concurrently
+#
+from .state import ForwardState
+
+__all__ = ['ForwardSchedule', 'forward_concurrently', 'forward_asynchronously']
+
+
+class ForwardSchedule(object):
+    """
+    Bookkeeping to forward the unvisited ancestors of target nodes out of order.
+
+    A node is launched once all of its parents are settled and it is ready to
+    forward. A node is dropped (settled without running, it stays unvisited)
+    once it is forbidden to forward, once it turns out not ready after all of its
+    parents are settled, or once no pending node needs it any more. The last rule
+    plays the role of the short-circuit of sequential seek: bad news of a parent
+    saves the forwarding of the other parents.
+
+    Nodes are keyed by their slot indices, so all targets should be of the same graph.
+    """
+    def __init__(self, targets):
+        self._nodes         = dict()  # {index: node} of nodes in the plan
+        self._parents       = dict()  # {index: [parent index in the plan, ...]}
+        self._children      = dict()  # {index: [child index in the plan, ...]}
+        self._num_pending   = dict()  # {index: number of unsettled parents}
+        self._num_consumers = dict()  # {index: number of children (or target) needing the node}
+        self._launched = set()
+        self._settled  = set()
+
+        ## 1) collect targets and their unvisited ancestors
+        stack = list()
+        for node in targets:
+            if node._forward_state == ForwardState.unvisited:
+                if self._add_node(node):
+                    stack.append(node)
+                self._num_consumers[node._index] += 1
+
+        while len(stack) > 0:
+            node = stack.pop()
+            for parent in node._parents:
+                if parent._forward_state == ForwardState.unvisited:
+                    if self._add_node(parent):
+                        stack.append(parent)
+                    self._parents[node._index].append(parent._index)
+                    self._children[parent._index].append(node._index)
+                    self._num_consumers[parent._index] += 1
+            self._num_pending[node._index] = len(self._parents[node._index])
+
+    def _add_node(self, node):
+        if node._index in self._nodes:
+            return False
+        self._nodes[node._index] = node
+        self._parents[node._index] = list()
+        self._children[node._index] = list()
+        self._num_consumers[node._index] = 0
+        return True
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def nodes(self):
+        return self._nodes.values()
+
+    def start(self):
+        """
+        Return the list of nodes to launch first
+        """
+        to_launch, dropped = list(), list()
+        for index in self._nodes:
+            self._evaluate(index, to_launch, dropped)
+        self._propagate(dropped, to_launch)
+        return to_launch
+
+    def finish(self, node):
+        """
+        Settle a launched node whose forward method is finished, return the list
+        of nodes to launch next
+        """
+        assert node._index in self._launched, "{} is not launched".format(node)
+        self._settled.add(node._index)
+        to_launch = list()
+        self._propagate([(node._index, False)], to_launch)
+        return to_launch
+
+    def _evaluate(self, index, to_launch, dropped):
+        """
+        Launch or drop an unsettled node according to states of its parents
+        """
+        if index in self._settled or index in self._launched:
+            return
+        node = self._nodes[index]
+        if node._forbidden_forwarding():
+            self._settled.add(index)
+            dropped.append((index, True))
+        elif self._num_pending[index] == 0:
+            if node._ready_to_forward():
+                self._launched.add(index)
+                to_launch.append(node)
+            else:
+                self._settled.add(index)
+                dropped.append((index, True))
+
+    def _propagate(self, settled, to_launch):
+        """
+        Propagate settled nodes [(index, dropped), ...] to their children, and
+        release the parents of dropped nodes
+        """
+        while len(settled) > 0:
+            index, dropped = settled.pop()
+
+            ## 1) children see one more settled parent
+            for child_index in self._children[index]:
+                if child_index in self._settled or child_index in self._launched:
+                    continue
+                self._num_pending[child_index] -= 1
+                self._evaluate(child_index, to_launch, settled)
+
+            ## 2) parents are not needed by a dropped node any more
+            if dropped:
+                for parent_index in self._parents[index]:
+                    self._num_consumers[parent_index] -= 1
+                    if self._num_consumers[parent_index] == 0 and \
+                            parent_index not in self._settled and parent_index not in self._launched:
+                        self._settled.add(parent_index)
+                        settled.append((parent_index, True))
+
+
+def forward_concurrently(targets, executor):
+    """
+    Forward towards target nodes (included), running forward methods of nodes
+    ready at the same time concurrently on executor (concurrent.futures.Executor).
+    Exceptions raised by forward methods are re-raised once running nodes finish.
+    """
+    import concurrent.futures
+    schedule = ForwardSchedule(targets)
+    futures = {executor.submit(node._run_forward): node for node in schedule.start()}
+    try:
+        while len(futures) > 0:
+            done, _ = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                node = futures.pop(future)
+                future.result()
+                for next_node in schedule.finish(node):
+                    futures[executor.submit(next_node._run_forward)] = next_node
+    except:
+        for future in futures:
+            future.cancel()
+        concurrent.futures.wait(futures)
+        raise
+
+
+async def forward_asynchronously(targets, executor=None):
+    """
+    Forward towards target nodes (included) inside the running event loop, running
+    forward methods of nodes ready at the same time as concurrent tasks. Plain
+    forward methods are run in executor if given.
+    Exceptions raised by forward methods are re-raised once running nodes finish.
+    """
+    import asyncio
+    schedule = ForwardSchedule(targets)
+    tasks = {asyncio.ensure_future(node._arun_forward(executor)): node for node in schedule.start()}
+    try:
+        while len(tasks) > 0:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                node = tasks.pop(task)
+                task.result()
+                for next_node in schedule.finish(node):
+                    tasks[asyncio.ensure_future(next_node._arun_forward(executor))] = next_node
+    except:
+        for task in tasks:
+            task.cancel()
+        if len(tasks) > 0:
+            await asyncio.wait(tasks)
+        raise
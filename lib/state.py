@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class ForwardState(Enum):
+    unvisited = 0
+    success = 1
+    failure = 2
+    error = 3  # in case of exception
@@ -0,0 +1,78 @@
+#
+# Drawing of flow views of graphs, graphviz is imported only here
+#
+from graphviz import Digraph
+
+from .node import NodePI
+
+__all__ = ['build_digraph']
+
+
+def build_digraph(root, splines='curved', profile=None):
+    """
+    Build the graphviz Digraph of the flow view of the graph of root, see
+    NodeBase.draw_graph()
+    """
+    g = Digraph('G', filename='graph')
+    g.attr('node', shape='box')
+
+    legal_edge_styles = ['line', 'curved', 'spline', 'polyline', 'ortho']
+    assert splines in legal_edge_styles, \
+        "'splines' must be one of the following style: {}".format(legal_edge_styles)
+
+    g.graph_attr['splines'] = splines
+
+    # overlay stats of forward runs, from a Profiler or its stats()
+    stats = profile.stats() if hasattr(profile, 'stats') else profile
+    if stats is not None:
+        max_wall_mean = max([x['wall_mean'] for x in stats.values()], default=0.)
+        max_calls = max([x['calls'] for x in stats.values()], default=1)
+
+    def _edge_attribute(parent, child):
+        edge_attr = root._get_edge_attribute(parent, child)
+        if stats is not None:
+            edge_attr.update(root._get_profile_edge_attribute(parent, child, stats, max_calls))
+        return edge_attr
+
+    # collect nodes and edges
+    nodes, edges = dict(), dict()
+    all_nodes = root._traverse_graph(lambda node: node, mode='complete')
+    nodepi_parents = dict()  # Dictionary to store NodePI nodes and their parents
+    for node in all_nodes:
+        nodes[str(node)] = root._get_node_attribute(node)
+        if stats is not None:
+            nodes[str(node)].update(root._get_profile_attribute(node, stats, max_wall_mean))
+        if isinstance(node, NodePI):  # Assuming NodePI is a specific class
+            parent_ids = tuple(sorted([str(parent) for parent in node._parents]))
+            nodepi_parents.setdefault(parent_ids, []).append(node)
+            continue
+        for parent_id, parent in enumerate(node._parents):
+            edges[(str(parent), str(node), parent_id)] = _edge_attribute(parent, node)
+
+    # Stacking NodePI nodes with shared parents using invisible edges and surrounding them with a box
+    cluster_count = 0
+    for parent_ids, nodepi_group in nodepi_parents.items():
+        assert len(nodepi_group) > 0
+        with g.subgraph(name='cluster_{}'.format(cluster_count)) as c:
+            c.attr(
+                label='', style='rounded, filled',
+                pencolor='lightgrey', color='lightyellow')
+            for node in nodepi_group:
+                c.node(str(node))
+            for i in range(len(nodepi_group) - 1):
+                c.edge(str(nodepi_group[i]), str(nodepi_group[i+1]), style='invis')  # Invisible edge
+            # draw edge between parent and first node in nodepi_group
+            first_node = nodepi_group[0]
+            assert len(first_node._parents) == 1
+            parent = first_node._parents[0]
+            edge_attr = _edge_attribute(parent, first_node)
+            g.edge(str(parent), str(first_node), **edge_attr)
+        cluster_count += 1
+
+    # draw nodes and edges
+    for node_str, node_attr in nodes.items():
+        g.node(node_str, **node_attr)
+    for (parent_str, node_str, _), edge_attr in edges.items():
+        g.edge(parent_str, node_str, **edge_attr)
+
+    return g
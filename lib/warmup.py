@@ -0,0 +1,102 @@
+#
+# Preloading of static initializers before graphs are used
+#
+import time
+import threading
+
+__all__ = ['find_static_initializers', 'warm_up']
+
+
+def find_static_initializers(root):
+    """
+    Find static initializers of nodes in the graph of a bootstrap node. Keyed
+    initializers, and the ones requiring arguments, are skipped since their
+    arguments are unknown.
+
+    Return:
+        list of (node, method name) to call, one per initializer
+    """
+    graph = root._graph
+    nodes = [graph.node(index) for index in graph.template.surface]
+    if graph.template.bootstrap_index is None:
+        nodes.insert(0, root)
+
+    found, initializers = set(), list()
+    for node in nodes:
+        overridden = set()
+        for klass in type(node).__mro__:
+            for name, attr in vars(klass).items():
+                if name in overridden:
+                    continue
+                overridden.add(name)
+                if getattr(attr, '__static_initializer__', False) and not attr.keyed \
+                        and id(attr) not in found and not _requires_arguments(attr):
+                    # inherited initializers are shared by node classes
+                    found.add(id(attr))
+                    initializers.append((node, name))
+    return initializers
+
+
+def _requires_arguments(method):
+    import inspect
+    parameters = list(inspect.signature(method).parameters.values())[1:]  # skip self
+    return any(param.default is param.empty and
+               param.kind not in (param.VAR_POSITIONAL, param.VAR_KEYWORD)
+               for param in parameters)
+
+
+def warm_up(node_class, max_workers=None, wait=True):
+    """
+    Preload static initializers of nodes reachable from a bootstrap class in parallel
+    threads, so that the first seek doesn't pay for loading:
+
+        report = warm_up(Image)  # {'Bump.initialize_bump_finder': 2.03, ...}
+
+    Initializers are reported by the qualified names of their methods, so an
+    initializer inherited by node classes is reported under its defining class.
+
+    Exceptions raised by initializers are re-raised.
+
+    Args:
+        - node_class: class of the bootstrap node
+        - max_workers: number of loading threads, one per initializer by default
+        - wait: wait for loading to finish, or return a concurrent.futures.Future
+        of the report to load in background
+
+    Return:
+        report of load time in seconds {'DefiningClass.method_name': seconds}
+    """
+    import concurrent.futures
+    root = node_class()
+    initializers = find_static_initializers(root)
+
+    def _load(node, name):
+        start_time = time.perf_counter()
+        getattr(node, name)()
+        return time.perf_counter() - start_time
+
+    def _load_all(root):
+        # root: the bootstrap node keeps its graph alive until loading is done
+        report = dict()
+        if len(initializers) == 0:
+            return report
+        num_workers = max_workers or len(initializers)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
+            futures = [executor.submit(_load, node, name) for node, name in initializers]
+            for (node, name), future in zip(initializers, futures):
+                report[getattr(type(node), name).__qualname__] = future.result()
+        return report
+
+    if wait:
+        return _load_all(root)
+
+    future = concurrent.futures.Future()
+    def _run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(_load_all(root))
+        except BaseException as e:
+            future.set_exception(e)
+    threading.Thread(target=_run, daemon=True).start()
+    return future
@@ -0,0 +1,92 @@
+import sys
+sys.path.append('.')
+
+from lib.node import *
+from lib.registry import hook_parent, registry
+from lib.batch import GraphBatch
+from lib.profiler import Profiler
+
+import numpy as np
+from collections import Counter
+
+# number of calls to forward methods of each node
+call_counter = Counter()
+
+
+class Image(NodeSI):
+    def __str__(self):
+        return 'image'
+
+    @classmethod
+    def initialize(cls, img):
+        node = cls()
+        node.img = img
+        return node
+
+
+@hook_parent(Image)
+class Scale(NodeSI):
+    def __str__(self):
+        return 'scale'
+
+    @classmethod
+    def forward_batch(cls, nodes):
+        call_counter['scale-batch'] += 1
+        imgs = np.stack([node.parent.img for node in nodes]) * 2
+        for node, img in zip(nodes, imgs):
+            node.img = img
+        return [True] * len(nodes)
+
+    def forward(self):
+        return self.forward_batch([self])[0]
+
+
+@hook_parent(Scale)
+class Bright(NodeSI):
+    def __str__(self):
+        return 'bright'
+
+    @classmethod
+    def forward_batch(cls, nodes):
+        call_counter['bright-batch'] += 1
+        imgs = np.stack([node.parent.img for node in nodes])
+        mask = imgs.mean(axis=(1, 2)) > 10
+        for node, img in zip(nodes, imgs):
+            node.img = img
+        return mask
+
+    def forward(self):
+        return self.forward_batch([self])[0]
+
+
+@hook_parent(Bright)
+class Dark(NodeNI):
+    def __str__(self):
+        return 'dark'
+
+    def forward(self):
+        call_counter['dark'] += 1
+        self.img = self.parent.img
+        return True
+
+
+@hook_parent(Bright)
+class Mean(NodeSI):
+    def __str__(self):
+        return 'mean'
+
+    def forward(self):
+        call_counter['mean'] += 1
+        self.val = self.parent.img.mean()
+        return True
+
+
+@hook_parent(Mean, Dark)
+class Result(NodeCI):
+    def __str__(self):
+        return 'result'
+
+    def forward(self):
+        bright, dark = self.parent_list
+        self.val = bright.val if bright else -1
+        return True
@@ -0,0 +1,59 @@
+from graph import *
+
+def _make_batch():
+    imgs = [np.full((4, 4), val, dtype='float32') for val in [1, 8, 3, 20]]
+    return GraphBatch.from_inputs(Image, imgs, lambda node, img: setattr(node, 'img', img))
+
+class Test:
+    def test_batch_seek(self):
+        batch = _make_batch()
+        call_counter.clear()
+        nodes = batch.seek('result')
+        assert [node.val for node in nodes] == [-1, 16, -1, 40]
+        assert call_counter['scale-batch'] == 1
+        assert call_counter['bright-batch'] == 1
+        assert call_counter['mean'] == 2
+        assert call_counter['dark'] == 2
+
+        # gating follows the mask of each graph
+        assert [node is not None for node in batch.seek('dark')] == [True, False, True, False]
+        assert [node is not None for node in batch.seek('mean')] == [False, True, False, True]
+
+    def test_batch_seek_many(self):
+        batch = _make_batch()
+        results = batch.seek_many(['mean', 'dark'])
+        assert [sorted(name for name, node in res.items() if node) for res in results] == \
+            [['dark'], ['mean'], ['dark'], ['mean']]
+
+        # same results as seeking graphs one by one
+        batch.reset()
+        for node, img in zip(batch, [1, 8, 3, 20]):
+            node.img = np.full((4, 4), img, dtype='float32')
+        for root, node in zip(batch, batch.seek('result')):
+            assert Image.initialize(root.img).seek('result').val == node.val
+
+    def test_batch_exception(self):
+        batch = GraphBatch([Image.initialize(np.zeros((4, 4))), Image.initialize(np.zeros((5, 5)))])
+        try:
+            batch.seek('scale')  # arrays of different shapes can not be stacked
+        except ValueError:
+            pass
+        else:
+            raise RuntimeError("Failed to raise exception of forward_batch()")
+
+    def test_batch_template(self):
+        root = Image.initialize(np.zeros((4, 4)))
+        registry.invalidate()  # graphs built from now on compile a new template
+        try:
+            GraphBatch([root, Image.initialize(np.zeros((4, 4)))])
+        except AssertionError:
+            pass
+        else:
+            raise RuntimeError("Failed to reject graphs of different templates")
+
+    def test_batch_profile(self):
+        with Profiler() as profiler:
+            _make_batch().seek('bright')
+        stats = profiler.stats(method='forward_batch')
+        assert stats['scale']['success'] == 1
+        assert stats['bright']['failure'] == 1  # some graphs fail
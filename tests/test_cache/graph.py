@@ -0,0 +1,111 @@
+import sys
+sys.path.append('.')
+
+from lib.node import *
+from lib.registry import hook_parent
+from lib.cache import cache_forward, persist_forward
+from lib.batch import GraphBatch
+
+import atexit
+import shutil
+import tempfile
+import numpy as np
+from collections import Counter
+
+# number of calls to forward methods of each node
+call_counter = Counter()
+
+
+class Image(NodeSI):
+    def __str__(self):
+        return 'image'
+
+    @classmethod
+    def initialize(cls, image_id):
+        node = cls()
+        node.image_id = image_id
+        node.img = np.full((8, 8), image_id, dtype='float64')
+        return node
+
+
+@hook_parent(Image)
+@cache_forward(lambda node: node.parent.image_id, maxsize=2)
+class Blur(NodeSI):
+    def __str__(self):
+        return 'blur'
+
+    def forward(self):
+        call_counter['blur'] += 1
+        self.img = self.parent.img / 2
+        return True
+
+
+@hook_parent(Blur)
+@cache_forward(lambda node: float(node.parent.img.mean()))
+class Detect(NodeSI):
+    def __str__(self):
+        return 'detect'
+
+    def forward(self):
+        call_counter['detect'] += 1
+        self.score = float(self.parent.img.mean())
+        return self.score < 10
+
+    @classmethod
+    def forward_batch(cls, nodes):
+        call_counter['detect-batch'] += 1
+        return [node.forward() for node in nodes]
+
+
+@hook_parent(Image)
+@cache_forward(lambda node: node.parent.image_id, maxbytes=1000)
+class Upsample(NodeSI):
+    def __str__(self):
+        return 'upsample'
+
+    def forward(self):
+        call_counter['upsample'] += 1
+        self.img = np.repeat(self.parent.img, self.parent.image_id, axis=0)
+        return True
+
+
+# a cached base class, whose subclasses keep results of their own
+@cache_forward(lambda node: node.parent.image_id)
+class Flag(NodeSI):
+    def forward(self):
+        call_counter[str(self)] += 1
+        self.out = str(self)
+        return self.positive
+
+
+@hook_parent(Image)
+class PositiveFlag(Flag):
+    positive = True
+
+    def __str__(self):
+        return 'positive'
+
+
+@hook_parent(Image)
+class NegativeFlag(Flag):
+    positive = False
+
+    def __str__(self):
+        return 'negative'
+
+
+store_dir = tempfile.mkdtemp()
+atexit.register(shutil.rmtree, store_dir, ignore_errors=True)
+
+
+@hook_parent(Image)
+@persist_forward(store_dir, lambda node: node.parent.image_id, maxbytes=2000)
+class Edge(NodeSI):
+    def __str__(self):
+        return 'edge'
+
+    def forward(self):
+        call_counter['edge'] += 1
+        self.img = self.parent.img - 1
+        self.label = 'edge-{}'.format(self.parent.image_id)
+        return self.parent.image_id < 10
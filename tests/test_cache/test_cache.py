@@ -0,0 +1,87 @@
+from graph import *
+
+class Test:
+    def test_cache_hit(self):
+        Blur._forward_cache.clear()
+        call_counter.clear()
+        node1 = Image.initialize(4).seek('blur')
+        node2 = Image.initialize(4).seek('blur')
+        assert call_counter['blur'] == 1
+        assert node2._forward_state == ForwardState.success
+        assert np.all(node1.img == node2.img)
+        assert Blur._forward_cache.stats['hits'] == 1
+
+        # cached failures
+        assert not Image.initialize(40).seek('detect')
+        assert not Image.initialize(40).seek('detect')
+        assert Image.initialize(40)['detect']._forward_state == ForwardState.unvisited
+        assert call_counter['detect'] == 1
+
+    def test_lru_eviction(self):
+        Blur._forward_cache.clear()
+        call_counter.clear()
+        for image_id in [1, 2, 1, 3, 1, 2]:
+            assert Image.initialize(image_id).seek('blur').img.mean() == image_id / 2
+        # 2 is evicted by 3, 1 is kept as the most recently used
+        assert call_counter['blur'] == 4
+        assert len(Blur._forward_cache) == 2
+
+    def test_byte_eviction(self):
+        cache = Upsample._forward_cache
+        cache.clear()
+        Image.initialize(1).seek('upsample')  # 512 bytes
+        assert len(cache) == 1
+        Image.initialize(2).seek('upsample')  # 1024 bytes, too large to be cached
+        assert len(cache) == 1
+        Image.initialize(1).seek('upsample')
+        assert cache.hits == 1 and cache.nbytes <= 1000
+
+    def test_batch_cache(self):
+        Detect._forward_cache.clear()
+        batch = GraphBatch([Image.initialize(image_id) for image_id in [2, 4, 2]])
+        call_counter.clear()
+        assert [node.score for node in batch.seek('detect')] == [1, 2, 1]
+        assert call_counter['detect-batch'] == 1 and call_counter['detect'] == 3
+
+        # all hits, forward_batch is skipped
+        batch = GraphBatch([Image.initialize(image_id) for image_id in [2, 4]])
+        assert [node.score for node in batch.seek('detect')] == [1, 2]
+        assert call_counter['detect-batch'] == 1
+
+    def test_subclass_cache(self):
+        root = Image.initialize(1)
+        assert root.seek('positive').out == 'positive'
+        assert not root.seek('negative')
+        assert root['negative'].out == 'negative'
+        assert call_counter['negative'] == 1
+
+    def test_disk_store(self):
+        store = Edge._forward_cache
+        store.clear()
+        call_counter.clear()
+        node = Image.initialize(3).seek('edge')
+        assert call_counter['edge'] == 1 and store.misses == 1
+
+        # results are loaded from disk, arrays are memory-mapped
+        node = Image.initialize(3).seek('edge')
+        assert call_counter['edge'] == 1 and store.hits == 1
+        assert node.label == 'edge-3' and np.all(node.img == 2)
+        assert isinstance(node.img, np.memmap) and not node.img.flags.writeable
+
+        # stored failures
+        assert not Image.initialize(20).seek('edge')
+        assert not Image.initialize(20).seek('edge')
+        assert call_counter['edge'] == 2
+
+    def test_disk_eviction(self):
+        store = Edge._forward_cache
+        store.clear()
+        for image_id in range(1, 6):
+            Image.initialize(image_id).seek('edge')
+        assert 0 < len(store) < 5 and store.nbytes <= 2000
+        assert store._nbytes == store.nbytes  # counted without scanning the directory on every put
+        # the last one is kept
+        call_counter.clear()
+        Image.initialize(5).seek('edge')
+        assert call_counter['edge'] == 0
+        assert store.stats['hits'] == 1
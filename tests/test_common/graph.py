@@ -330,4 +330,17 @@ class Plus2(NodeNI):
 
     def forward(self):
         self.val = self.parent.val + 2
-        return True
\ No newline at end of file
+        return True
+
+class Config(NodeSI):
+    def __str__(self):
+        return 'config'
+
+@hook_parent(Config)
+class Option(NodeSI):
+    def __str__(self):
+        return 'option'
+
+    def _initialize_node(self):
+        super()._initialize_node()
+        self.config = self['config']
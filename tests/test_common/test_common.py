@@ -1,5 +1,8 @@
 from graph import Input
 from graph import Sqrt
+from graph import Config
+
+from concurrent.futures import ThreadPoolExecutor
 
 class Test:
     def test_setup(self):
@@ -36,6 +39,26 @@ class Test:
         assert node_quantum == node
 
 
+    def test_name_lookup(self):
+        root1 = Input.initialize(3)
+        root2 = Input.initialize(4)
+        for name in ['input', 'plus', 'sqrt', 'bigger', '+1']:
+            assert str(root1[name]) == name
+            assert root1[name] is root1[name]['input'][name]
+            assert root1[name] is not root2[name]
+        assert root1['input'] == root1
+
+        try:
+            root1['unexisted-node']
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("Failed to check unexisted node name")
+
+        # nodes are found by names while being initialized, in the first graph too
+        root = Config()
+        assert root['option'].config is root
+
     def test_seek(self):
         root = Input.initialize(3)
         node = root.seek('plus')
@@ -73,6 +96,44 @@ class Test:
 
         assert not root.seek('not-dead-cond')
 
+    def test_concurrent_seek(self):
+        names = Input().traverse(lambda node: str(node))
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            for name in names:
+                root1 = Input.initialize(3)
+                root2 = Input.initialize(3)
+                node1 = root1.seek(name)
+                node2 = root2.seek(name, executor=executor)
+                assert (node1 is None) == (node2 is None)
+                if node1 is not None:
+                    assert getattr(node1, 'val', None) == getattr(node2, 'val', None)
+
+    def test_seek_many(self):
+        names = ['plus', 'float-res', 'bigger', 'dead-cond', 'not-s>p', '+2', 'broken']
+        root = Input.initialize(3)
+        nodes = root.seek_many(names)
+        assert sorted(nodes) == sorted(names)
+        for name in names:
+            node = Input.initialize(3).seek(name)
+            assert (node is None) == (nodes[name] is None)
+            if node is not None:
+                assert node.val == nodes[name].val
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            assert Input.initialize(3).seek_many(names, executor=executor)['bigger'].val == 214
+
+        # leaves only
+        root = Input.initialize(3)
+        nodes = root.seek_leaves()
+        assert 'bigger' in nodes and 'plus' not in nodes
+        assert nodes['not-dead-cond'] is None
+        assert nodes['+1'].val == 65
+
+        root = Input.initialize(3)
+        nodes = root.seek_leaves(lambda node: str(node).startswith('+'))
+        assert sorted(nodes) == ['+1', '+2', '+3']
+        assert not hasattr(root['x3'], 'val')
+
     def test_retr(self):
         root = Input.initialize(3)
 
@@ -106,4 +106,26 @@ class Test:
         except:
             pass
         else:
-            raise "Failed to execute checking when retrospecting to node"
\ No newline at end of file
+            raise "Failed to execute checking when retrospecting to node"
+
+    def test_lineage_cache(self):
+        root = Node1()
+        lineage = root._get_clean_lineage()
+        assert Node1()._get_clean_lineage() is lineage
+
+        # registering a new class drops the compiled lineage
+        @hook_parent(Node1C)
+        class NodeCached(NodeSI):
+            def __str__(self):
+                return 'node-cached'
+
+            def forward(self):
+                return True
+
+        root = Node1()
+        assert root._get_clean_lineage() is not lineage
+        assert NodeCached in root._get_clean_lineage()
+        assert root.seek('node-cached')
+
+        registry._lineage.pop(NodeCached)
+        assert NodeCached not in Node1()._get_clean_lineage()
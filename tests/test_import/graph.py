@@ -0,0 +1,27 @@
+import sys
+sys.path.append('.')
+
+from lib.node import *
+from lib.registry import hook_parent
+
+
+class Input(NodeSI):
+    def __str__(self):
+        return 'input'
+
+
+@hook_parent(Input)
+class Square(NodeSI):
+    def __str__(self):
+        return 'square'
+
+    def forward(self):
+        self.val = self.parent.val ** 2
+        return True
+
+
+# modules not needed to run graphs, which slow down imports
+HEAVY_MODULES = [
+    'graphviz', 'numpy', 'asyncio', 'concurrent.futures', 'inspect',
+    'pickle', 'json', 'uuid', 'shutil', 'hashlib', 'logging', 'subprocess',
+]
@@ -0,0 +1,43 @@
+import sys
+import statistics
+import subprocess
+
+# budget of `import lib` in a fresh interpreter, in seconds
+IMPORT_BUDGET = 0.15
+
+
+def run_python(code):
+    res = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return res.stdout
+
+
+class Test:
+    def test_standard_library_only(self):
+        # block graphviz: graphs run without it, only drawing needs it
+        output = run_python(
+            "import sys\n"
+            "sys.modules['graphviz'] = None\n"
+            "sys.path.insert(0, 'tests/test_import')\n"
+            "from graph import *\n"
+            "root = Input()\n"
+            "root.val = 3\n"
+            "assert root.seek('square').val == 9\n"
+            "print(' '.join(m for m in HEAVY_MODULES if sys.modules.get(m) is not None))\n"
+            "try:\n"
+            "    root.draw_graph()\n"
+            "except ImportError:\n"
+            "    print('no graphviz')\n"
+        )
+        assert output.split('\n')[:2] == ['', 'no graphviz']
+
+    def test_import_budget(self):
+        durations = [
+            float(run_python(
+                "import time\n"
+                "start_time = time.perf_counter()\n"
+                "import lib\n"
+                "print(time.perf_counter() - start_time)\n"
+            ))
+            for _ in range(3)
+        ]
+        assert statistics.median(durations) < IMPORT_BUDGET, durations
@@ -0,0 +1,68 @@
+import sys
+sys.path.append('.')
+
+from lib.node import *
+from lib.registry import hook_parent
+
+from collections import Counter
+
+# number of node instances created of each class
+num_created = Counter()
+
+
+class Counted(object):
+    def __init__(self, *args, **kwargs):
+        num_created[type(self).__name__] += 1
+        super().__init__(*args, **kwargs)
+
+
+class Image(Counted, NodeSI):
+    lazy_graph = True
+
+    def __str__(self):
+        return 'image'
+
+
+@hook_parent(Image)
+class Gray(Counted, NodeSI):
+    def __str__(self):
+        return 'gray'
+
+    def forward(self):
+        self.val = self.parent.val + 1
+        return True
+
+
+@hook_parent(Gray)
+class Edge(Counted, NodeSI):
+    def __str__(self):
+        return 'edge'
+
+    def forward(self):
+        self.val = self.parent.val * 2
+        return True
+
+
+@hook_parent([Gray, Edge])
+class Stat(Counted, NodeSI):
+    def __str__(self):
+        return 'stat'
+
+    def forward(self):
+        self.val = -self.parent.val
+        return True
+
+
+# experimental nodes, never used
+def make_experiment(i):
+    class Experiment(Counted, NodeSI):
+        def __str__(self):
+            return 'experiment-{}'.format(i)
+
+        def forward(self):
+            self.val = self.parent.val + i
+            return True
+    Experiment.__name__ = 'Experiment{}'.format(i)
+    return hook_parent(Edge)(Experiment)
+
+experiments = [make_experiment(i) for i in range(20)]
@@ -0,0 +1,47 @@
+from graph import *
+from concurrent.futures import ThreadPoolExecutor
+
+
+def make_image(val):
+    root = Image()
+    root.val = val
+    return root
+
+
+class Test:
+    def test_lazy_graph(self):
+        # the first graph is complete, to check names
+        make_image(0)
+        num_created.clear()
+
+        root = make_image(1)
+        assert dict(num_created) == {'Image': 1}
+        assert root.seek('edge').val == 4
+        assert dict(num_created) == {'Image': 1, 'Gray': 1, 'Edge': 1}
+
+        # quantum layers are created on demand as well
+        assert root.seek('stat').val == -2
+        assert num_created['Stat'] == 1 and num_created['Gray'] == 1
+
+        # nodes are created by indexing and traversal
+        root['experiment-3']
+        assert num_created['Experiment3'] == 1 and len(num_created) == 5
+        names = root.traverse(lambda node: str(node))
+        assert len(names) == 24 and num_created['Experiment19'] == 1
+        assert len(list(root._graph.nodes())) == len(root._graph) - 1
+
+    def test_lazy_reset(self):
+        root = make_image(1)
+        assert root.seek('edge').val == 4
+        root.reset()
+        root.val = 2
+        assert root.seek('edge').val == 6
+        assert root.retr('image') == root
+
+    def test_lazy_concurrency(self):
+        num_created.clear()
+        root = make_image(1)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            nodes = list(executor.map(root.seek, ['experiment-{}'.format(i) for i in range(20)]))
+        assert [node.val for node in nodes] == [4 + i for i in range(20)]
+        assert num_created['Gray'] == 1 and num_created['Edge'] == 1
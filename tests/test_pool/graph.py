@@ -0,0 +1,38 @@
+import sys
+sys.path.append('.')
+
+from lib.node import *
+from lib.registry import hook_parent
+from lib.pool import GraphPool
+
+
+class Input(NodeSI):
+    def __str__(self):
+        return 'input'
+
+    def _initialize_node(self):
+        super()._initialize_node()
+        self.num_images = 0
+
+
+@hook_parent(Input)
+class Double(NodeSI):
+    def __str__(self):
+        return 'double'
+
+    def forward(self):
+        self.val = self.parent.val * 2
+        return True
+
+
+@hook_parent(Double)
+class Positive(NodeSI):
+    def __str__(self):
+        return 'positive'
+
+    def forward(self):
+        if self.parent.val > 0:
+            self.val = self.parent.val
+            return True
+        else:
+            return False
@@ -0,0 +1,72 @@
+import threading
+
+from graph import *
+
+class Test:
+    def test_reset(self):
+        root = Input()
+        root.val = 3
+        root.broadcast({'message': 'hello'})
+        assert root.seek('positive').val == 6
+
+        root.reset()
+        assert root['double']._forward_state == ForwardState.unvisited
+        assert not hasattr(root['double'], 'val')
+        assert not hasattr(root, 'val')
+        assert root.num_images == 0  # initialized again
+        assert 'message' not in root.broadcasting
+
+        # the graph is reusable for new data
+        root.val = -4
+        assert not root.seek('positive')
+        assert root['double'].val == -8
+
+        root.reset()
+        root.val = 5
+        assert root.seek('positive').val == 10
+
+    def test_pool(self):
+        pool = GraphPool(Input, maxsize=2)
+        root1 = pool.acquire()
+        root2 = pool.acquire()
+        assert pool.num_created == 2
+        try:
+            pool.acquire(timeout=0.01)
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("Failed to bound the number of graphs")
+
+        root1.val = 1
+        assert root1.seek('double').val == 2
+        pool.release(root1)
+        pool.release(root2)
+        try:
+            pool.release(root1)
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("Failed to reject a graph released twice")
+
+        with pool.checkout() as root:
+            assert root is root2
+            assert root['double']._forward_state == ForwardState.unvisited
+        assert pool.num_created == 2
+
+    def test_pool_threads(self):
+        pool = GraphPool(Input, maxsize=3)
+        results = dict()
+
+        def _worker(val):
+            with pool.checkout() as root:
+                root.val = val
+                results[val] = root.seek('double').val
+
+        threads = [threading.Thread(target=_worker, args=(val,)) for val in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == {val: val * 2 for val in range(20)}
+        assert pool.num_created <= 3
@@ -0,0 +1,103 @@
+import sys
+sys.path.append('.')
+
+from lib.node import *
+from lib.registry import hook_parent
+from lib.profiler import Profiler
+
+import time
+import numpy as np
+
+
+class Input(NodeSI):
+    def __str__(self):
+        return 'input'
+
+
+@hook_parent(Input)
+class Slow(NodeSI):
+    def __str__(self):
+        return 'slow'
+
+    def forward(self):
+        time.sleep(0.01)
+        self.val = self.parent.val
+        return True
+
+    def backward(self):
+        return True
+
+
+@hook_parent(Slow)
+class Busy(NodeSI):
+    def __str__(self):
+        return 'busy'
+
+    def forward(self):
+        # burn CPU time
+        start_time = time.thread_time()
+        while time.thread_time() - start_time < 0.005:
+            pass
+        return self.parent.val % 2 == 0
+
+    def backward(self):
+        return True
+
+
+@hook_parent(Slow)
+class Odd(NodeSI):
+    def __str__(self):
+        return 'odd'
+
+    def forward(self):
+        return np.bool_(self.parent.val % 2 == 1)
+
+
+@hook_parent(Slow)
+class Broken(NodeSI):
+    def __str__(self):
+        return 'broken'
+
+    def forward(self):
+        raise ValueError('broken node')
+
+
+def make_input(val):
+    root = Input()
+    root.val = val
+    return root
+
+
+# a diamond with an OR node: input -> (fast, slow2, failing) -> any -> last
+def make_branch(name, cost, success=True):
+    class Branch(NodeSI):
+        def __str__(self):
+            return name
+
+        def forward(self):
+            time.sleep(cost)
+            return success
+    Branch.__name__ = name.capitalize()
+    return hook_parent(Input)(Branch)
+
+Fast = make_branch('fast', 0.01)
+Slow2 = make_branch('slow2', 0.03)
+Failing = make_branch('failing', 0.05, success=False)
+
+
+@hook_parent(Fast, Slow2, Failing)
+class Any(NodeCI):
+    def __str__(self):
+        return 'any'
+
+    def forward(self):
+        return True
+
+
+@hook_parent(Fast, Slow2)
+class All(NodeMI):
+    def __str__(self):
+        return 'all'
+
+    def forward(self):
+        return True
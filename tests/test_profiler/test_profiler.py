@@ -0,0 +1,144 @@
+import pytest
+import json
+import pickle
+from graph import *
+from lib.profiler import observers
+
+
+class Test:
+    def test_profiler(self):
+        with Profiler() as profiler:
+            for val in range(4):
+                make_input(val).seek('busy')
+        assert len(observers) == 0
+
+        stats = profiler.stats()
+        assert set(stats) == {'input', 'slow', 'busy'}
+        assert stats['slow']['calls'] == 4 and stats['slow']['class'] == 'Slow'
+        assert stats['slow']['wall_mean'] >= 0.01 and stats['slow']['cpu_mean'] < 0.01
+        assert stats['busy']['cpu_mean'] >= 0.005
+        assert stats['busy']['success'] == 2 and stats['busy']['failure'] == 2
+        assert stats['busy']['failure_rate'] == 0.5
+        assert stats['slow']['wall_p50'] <= stats['slow']['wall_p95'] <= stats['slow']['wall_p99']
+        assert 'slow' in profiler.report().split('\n')[1]
+
+    def test_profiler_outcomes(self):
+        with Profiler() as profiler:
+            root = make_input(1)
+            with pytest.raises(ValueError):
+                root.seek('broken')
+            root.seek('slow').retr('input')
+        assert profiler.stats()['broken']['error'] == 1
+        assert profiler.stats(method='backward', by='class')['Slow']['calls'] == 1
+
+        # profiles of other processes can be merged
+        other = pickle.loads(pickle.dumps(profiler))
+        other.merge(profiler)
+        assert other.stats()['slow']['calls'] == 2
+
+        # numpy booleans are outcomes too
+        with Profiler() as profiler:
+            assert not make_input(2).seek('odd')
+        assert profiler.stats()['odd']['failure'] == 1
+
+    def test_percentile(self):
+        from lib.profiler import percentile
+        assert percentile([], 50) is None
+        assert percentile([1, 2], 50) == 1
+        assert percentile(list(range(20)), 95) == 18
+        assert percentile(list(range(100)), 95) == 94
+        assert percentile(list(range(100)), 0) == 0 and percentile(list(range(100)), 100) == 99
+
+    def test_disabled(self):
+        profiler = Profiler()
+        make_input(0).seek('busy')
+        assert len(profiler.stats()) == 0
+
+    def test_heatmap(self):
+        with Profiler() as profiler:
+            for val in range(4):
+                make_input(val).seek('busy')
+        source = make_input(0)._build_digraph(profile=profiler).source
+        lines = {line.strip().split(' ')[0]: line for line in source.split('\n')}
+        assert 'calls 4 fail 50%' in lines['busy'] and 'fillcolor="0 ' in lines['busy']
+        assert 'grey92' in lines['broken']
+        assert 'label=4' in source.split('slow -> busy')[1].split('\n')[0]
+
+    def test_critical_path(self):
+        with Profiler() as profiler:
+            root = make_input(1)
+            root.seek('any')
+            root.seek('all')
+
+        # all parents gate a NodeMI
+        res = root.critical_path('all', profiler)
+        assert [str(node) for node in res['path']] == ['input', 'slow2', 'all']
+        assert 0.03 <= res['length'] < res['work']
+        assert res['work'] >= 0.04 and res['speedup'] > 1.2
+
+        # a NodeCI waits for all parents that ran, failing ones included
+        res = root.critical_path('any', profiler)
+        assert [str(node) for node in res['path']] == ['input', 'failing', 'any']
+
+        # plain timings
+        res = root.critical_path('all', {'fast': 2., 'slow2': 1., 'all': 1.})
+        assert [str(node) for node in res['path']] == ['input', 'fast', 'all']
+        assert res['length'] == 3. and res['work'] == 4.
+
+    def test_critical_path_bound(self):
+        from concurrent.futures import ThreadPoolExecutor
+        with Profiler() as profiler:
+            make_input(1).seek('any')
+        length = make_input(1).critical_path('any', profiler)['length']
+
+        # no run of the executor beats the critical path
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            root = make_input(1)
+            start_time = time.perf_counter()
+            root.seek('any', executor=executor)
+            assert time.perf_counter() - start_time >= length
+
+    def test_tracer(self, tmp_path):
+        from lib.profiler import Tracer
+        from concurrent.futures import ThreadPoolExecutor
+        with Tracer() as tracer, ThreadPoolExecutor(max_workers=4) as executor:
+            root = make_input(1)
+            root.seek('all', executor=executor)
+            root['all'].retr('input')
+        tracer.save(str(tmp_path / 'trace.json'))
+        with open(str(tmp_path / 'trace.json')) as f:
+            events = json.load(f)['traceEvents']
+
+        spans = {(x['name'], x['cat']): x for x in events if x['ph'] == 'X'}
+        assert set(spans) >= {('input', 'forward'), ('fast', 'forward'), ('slow2', 'forward'), ('all', 'forward')}
+        assert spans[('fast', 'forward')]['args'] == {
+            'class': 'Fast', 'layer_id': 0, 'result': 'success',
+            'cpu_ms': spans[('fast', 'forward')]['args']['cpu_ms']}
+        assert spans[('fast', 'forward')]['dur'] >= 1e4
+
+        # parents ran concurrently on different threads
+        fast, slow = spans[('fast', 'forward')], spans[('slow2', 'forward')]
+        assert fast['tid'] != slow['tid']
+        assert fast['ts'] < slow['ts'] + slow['dur'] and slow['ts'] < fast['ts'] + fast['dur']
+        assert spans[('all', 'forward')]['ts'] >= slow['ts'] + slow['dur']
+        assert any(x['ph'] == 'M' and x['tid'] == fast['tid'] for x in events)
+
+    def test_tracer_async(self):
+        import asyncio
+        from lib.profiler import Tracer
+        from concurrent.futures import ThreadPoolExecutor
+        with Tracer() as tracer, ThreadPoolExecutor(max_workers=4) as executor:
+            asyncio.run(make_input(1).aseek('all', executor))
+        events = tracer.events()
+        assert not any(x['ph'] == 'X' for x in events)
+
+        # runs overlapping on the thread of the event loop are async spans of their own ids
+        begins = {x['id']: x for x in events if x['ph'] == 'b'}
+        ends = {x['id']: x for x in events if x['ph'] == 'e'}
+        assert set(begins) == set(ends)
+        spans = {x['name']: (x['ts'], ends[span_id]['ts']) for span_id, x in begins.items()}
+        assert set(spans) >= {'fast', 'slow2', 'all'}
+        assert len(set(x['tid'] for x in begins.values())) == 1
+        (fast_begin, fast_end), (slow_begin, slow_end) = spans['fast'], spans['slow2']
+        assert fast_begin < slow_end and slow_begin < fast_end
+        assert spans['all'][0] >= slow_end
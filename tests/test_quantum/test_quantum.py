@@ -73,4 +73,44 @@ class Test:
 
         assert node.val == 1.5
         node = node.retr('node12')
-        assert node.val == 2.5
\ No newline at end of file
+        assert node.val == 2.5
+
+    def test_graph_template(self):
+        root1, root2 = Node1(), Node1()
+        assert root1._graph.template is root2._graph.template
+        assert root1['node12'] is not root2['node12']
+
+        # each graph owns its nodes and their states
+        assert root1.seek('node123').val == 2.5
+        assert not hasattr(root2['node123'], 'val')
+
+        # a different bootstrap class has its own template
+        root3 = Node2()
+        assert root3._graph.template is not root1._graph.template
+        assert root3.seek('node5').val == 42
+
+    def test_compact_state(self):
+        root1, root2 = Node1(), Node1()
+        assert root1.seek('node123').val == 2.5
+        assert root2['node123']._forward_state == ForwardState.unvisited
+        assert root1._graph._states != root2._graph._states
+
+        # framework attributes are slots, parents are indexed in flat arrays
+        node = root1['node123']
+        assert '_graph' not in vars(node) and '_index' not in vars(node)
+        template = root1._graph.template
+        assert [root1._graph.node(index) for index in template.parents(node._index)] == node._parents
+
+    def test_node_identity(self):
+        root1, root2 = Node1(), Node1()
+        node = root1['node123']
+
+        # nodes are identified by (graph id, slot index)
+        assert node._identity == (root1._graph.id, node._index)
+        assert node != root2['node123'] and node._index == root2['node123']._index
+        assert len({node, root1['node123'], root2['node123']}) == 2
+        assert root1._graph[node._identity]['node'] is node
+
+        # the bootstrap node found in its graph is the node itself
+        assert root1['node1'] is root1 and root1._graph.node(root1._index) is root1
+        assert root1 in {root1['node1']} and len({root1, root1['node1'], node}) == 2
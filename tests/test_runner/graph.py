@@ -0,0 +1,71 @@
+import os
+import sys
+sys.path.append('.')
+
+from lib.node import *
+from lib.registry import hook_parent
+from lib.registry import static_initializer
+from lib.runner import GraphRunner
+from lib.runner import Pipeline
+
+# number of graphs built in current process
+num_built = 0
+# number of models loaded in current process
+num_loaded = 0
+
+
+class Input(NodeSI):
+    def __str__(self):
+        return 'input'
+
+    def __init__(self, *args, **kwargs):
+        global num_built
+        num_built += 1
+        super().__init__(*args, **kwargs)
+
+
+@hook_parent(Input)
+class Square(NodeSI):
+    def __str__(self):
+        return 'square'
+
+    def forward(self):
+        self.val = self.parent.val ** 2
+        return True
+
+
+@hook_parent(Input)
+class Odd(NodeSI):
+    def __str__(self):
+        return 'odd'
+
+    def forward(self):
+        self.val = self.parent.val
+        return self.parent.val % 2 == 1
+
+
+@hook_parent(Square)
+class Report(NodeSI):
+    def __str__(self):
+        return 'report'
+
+    def forward(self):
+        self.num_loaded = num_loaded
+        self.val = self.parent.val + self.initialize_model()
+        self.pid = os.getpid()
+        self.num_built = num_built
+        return True
+
+    @static_initializer
+    def initialize_model(self):
+        global num_loaded
+        num_loaded += 1
+        return 0
+
+
+def feed(root, datum):
+    root.val = datum
+
+
+def collect_val(node):
+    return node.val
@@ -0,0 +1,64 @@
+import graph
+from graph import *
+
+class Test:
+    def test_runner(self):
+        with GraphRunner(Input, ['square', 'odd'], feed, collect=collect_val, max_workers=2) as runner:
+            results = runner.map(range(20))
+            assert results == [{'square': i ** 2, 'odd': i if i % 2 else None} for i in range(20)]
+
+            results = sorted(runner.imap_unordered(range(20)))
+            assert results == [(i, {'square': i ** 2, 'odd': i if i % 2 else None}) for i in range(20)]
+
+    def test_runner_graph_reuse(self):
+        with GraphRunner(Input, ['report'], feed, max_workers=2) as runner:
+            results = [res['report'] for res in runner.imap(range(40))]
+        assert [res['val'] for res in results] == [i ** 2 for i in range(40)]
+        # every process builds its graph once
+        assert all(res['num_built'] == 1 for res in results)
+        assert 0 < len(set(res['pid'] for res in results)) <= 2
+
+    def test_runner_warm_up(self):
+        with GraphRunner(Input, ['report'], feed, warm_up=True, max_workers=2) as runner:
+            results = runner.map(range(10))
+        assert [result['report']['val'] for result in results] == [x ** 2 for x in range(10)]
+        # models are loaded before the first input of each process
+        assert all(result['report']['num_loaded'] == 1 for result in results)
+
+    def test_runner_exception(self):
+        with GraphRunner(Input, ['square'], feed, max_workers=2) as runner:
+            try:
+                runner.map([1, 2, 'a', 3])
+            except TypeError:
+                pass
+            else:
+                raise RuntimeError("Failed to raise exceptions of worker processes")
+
+    def test_pipeline(self):
+        pipeline = Pipeline(Input, ['square', 'odd'], feed)
+        results = list()
+        for nodes in pipeline.stream(range(50), prefetch=4):
+            results.append((nodes['square'].val, nodes['odd'] and nodes['odd'].val))
+        assert results == [(i ** 2, i if i % 2 else None) for i in range(50)]
+
+    def test_pipeline_backpressure(self):
+        pulled = list()
+
+        def _endless_inputs():
+            i = 0
+            while True:
+                pulled.append(i)
+                yield i
+                i += 1
+
+        num_built_before = graph.num_built
+        stream = Pipeline(Input, ['square'], feed).stream(_endless_inputs(), prefetch=3)
+        for i, nodes in enumerate(stream):
+            assert nodes['square'].val == i ** 2
+            # inputs are pulled only as results are consumed
+            assert len(pulled) <= i + 1 + 3
+            if i == 100:
+                break
+        stream.close()
+        # graphs are reused
+        assert 0 < graph.num_built - num_built_before <= 3 + 2
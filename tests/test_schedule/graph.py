@@ -0,0 +1,142 @@
+import sys
+sys.path.append('.')
+
+from lib.node import *
+from lib.registry import hook_parent
+
+import asyncio
+import threading
+from collections import Counter
+
+# number of times each node is explored by seek()
+explore_counter = Counter()
+
+
+class Source(NodeSI):
+    def __str__(self):
+        return 'source'
+
+    def forward(self):
+        self.val = 1
+        return True
+
+
+@hook_parent(Source)
+class Broken(NodeSI):
+    def __str__(self):
+        return 'broken'
+
+    def forward(self):
+        return False
+
+
+@hook_parent(Broken)
+class Dead(NodeSI):
+    def __str__(self):
+        return 'dead'
+
+    def forward(self):
+        return True
+
+
+class CountedCI(NodeCI):
+    def _ready_to_forward(self):
+        explore_counter[str(self)] += 1
+        return super()._ready_to_forward()
+
+    def forward(self):
+        self.val = sum(parent.val for parent in self.parent_list if parent)
+        return True
+
+
+class SumMI(NodeMI):
+    def forward(self):
+        self.val = sum(parent.val for parent in self.parent_list)
+        return True
+
+
+def make_node(name, node_type, *parents, **attributes):
+    """ Create and register a node class named by name """
+    attributes['__str__'] = lambda self: name
+    node_class = type(name.replace('-', '_'), (node_type,), attributes)
+    return hook_parent(*parents)(node_class)
+
+
+def make_diamond_chain(prefix, top, depth, node_type):
+    """
+    Chain of diamonds below node class top: each level forks to two nodes
+    which are joined again. Return the node class at the bottom
+    """
+    join = top
+    for level in range(depth):
+        left  = make_node('{}-left-{}'.format(prefix, level), node_type, join)
+        right = make_node('{}-right-{}'.format(prefix, level), node_type, join)
+        join  = make_node('{}-join-{}'.format(prefix, level), node_type, left, right)
+    return join
+
+
+# diamonds below a node which never runs: these nodes are neither ready nor forbidden
+DeadDiamonds = make_diamond_chain('dead-diamond', Dead, 24, CountedCI)
+
+# diamonds which all succeed: bottom value is 2 ** depth
+Diamonds = make_diamond_chain('diamond', Source, 24, SumMI)
+
+
+class Stage(NodeSI):
+    def forward(self):
+        self.val = self.parent.val + 1
+        return True
+
+    def backward(self):
+        self.parent.val = self.val
+        return True
+
+
+def make_chain(prefix, top, depth, node_type):
+    """ Chain of nodes below node class top, return the node class at the bottom """
+    node_class = top
+    for level in range(depth):
+        node_class = make_node('{}-{}'.format(prefix, level), node_type, node_class)
+    return node_class
+
+
+# chain deeper than the recursion limit
+Chain = make_chain('stage', Source, 3 * sys.getrecursionlimit(), Stage)
+
+
+# forward methods of the two branches can only pass the barrier when run concurrently
+branch_barrier = threading.Barrier(2, timeout=5)
+
+
+class Branch(NodeSI):
+    def forward(self):
+        branch_barrier.wait()
+        self.val = self.parent.val
+        return True
+
+
+BranchA = make_node('branch-a', Branch, Source)
+BranchB = make_node('branch-b', Branch, Source)
+BranchJoin = make_node('branch-join', SumMI, BranchA, BranchB)
+
+
+# coroutine forward methods of the two async branches only finish when run concurrently
+async_arrivals = list()
+
+
+class AsyncBranch(NodeSI):
+    async def forward(self):
+        async_arrivals.append(str(self))
+        for _ in range(1000):
+            if len(async_arrivals) % 2 == 0:
+                break
+            await asyncio.sleep(0.005)
+        else:
+            return False
+        self.val = self.parent.val
+        return True
+
+
+AsyncBranchA = make_node('async-branch-a', AsyncBranch, Source)
+AsyncBranchB = make_node('async-branch-b', AsyncBranch, Source)
+AsyncBranchJoin = make_node('async-branch-join', SumMI, AsyncBranchA, AsyncBranchB)
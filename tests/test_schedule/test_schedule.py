@@ -0,0 +1,74 @@
+from graph import *
+
+from concurrent.futures import ThreadPoolExecutor
+
+class Test:
+    def test_memoized_seek(self):
+        root = Source()
+        explore_counter.clear()
+        assert not root.seek('dead-diamond-join-23')
+        # every node is explored once, not once per path
+        assert max(explore_counter.values()) == 1
+        assert len(explore_counter) == 3 * 24
+
+        # nodes which can not run are explored again by the next seek only
+        assert not root.seek('dead-diamond-join-23')
+        assert max(explore_counter.values()) == 2
+
+    def test_seek_many(self):
+        root = Source()
+        explore_counter.clear()
+        nodes = root.seek_many(['dead-diamond-join-23', 'dead-diamond-left-23', 'dead-diamond-join-10'])
+        assert not any(nodes.values())
+        assert max(explore_counter.values()) == 1
+
+    def test_diamonds(self):
+        root = Source()
+        assert root.seek('diamond-join-23').val == 2 ** 24
+        assert root.seek('diamond-left-10').val == 2 ** 10
+
+    def test_deep_chain(self):
+        depth = 3 * sys.getrecursionlimit()
+        root = Source()
+        node = root.seek('stage-{}'.format(depth - 1))
+        assert node.val == depth + 1
+
+        node.val = -1
+        assert node.retr('source') == root
+        assert root.val == -1
+        assert root['stage-0'].val == -1
+
+    def test_concurrent_seek(self):
+        root = Source()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            assert root.seek('branch-join', executor=executor).val == 2
+            assert root.seek('diamond-join-23', executor=executor).val == 2 ** 24
+            assert not root.seek('dead-diamond-join-23', executor=executor)
+
+            depth = 3 * sys.getrecursionlimit()
+            assert root.seek('stage-{}'.format(depth - 1), executor=executor).val == depth + 1
+
+    def test_async_seek(self):
+        async def _seek():
+            root = Source()
+            node = await root.aseek('async-branch-join')
+            assert node.val == 2
+            assert (await root.aseek('diamond-join-23')).val == 2 ** 24
+            assert not await root.aseek('dead-diamond-join-23')
+
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                assert (await root.aseek('branch-join', executor=executor)).val == 2
+
+            # coroutine forward can not be run by seek() inside the event loop
+            try:
+                Source().seek('async-branch-a')
+            except RuntimeError:
+                pass
+            else:
+                raise RuntimeError("Failed to check coroutine forward in seek()")
+
+        asyncio.run(_seek())
+
+        # seek() runs coroutine forward outside of event loops
+        async_arrivals[:] = ['padding']
+        assert Source().seek('async-branch-a').val == 1
@@ -4,8 +4,13 @@ sys.path.append('.')
 from lib.node import *
 from lib.registry import hook_parent
 from lib.registry import static_initializer
+from lib.registry import static_modules, StaticModuleManager
+from lib.warmup import warm_up
 
+import time
+import threading
 import numpy as np
+from collections import Counter
 
 class Node1(NodeSI):
     def __str__(self):
@@ -67,4 +72,29 @@ class Node2C(Layer, NodeSI):
     @static_initializer
     def initializer_unique(self):
         random_mat = np.random.rand(5,5)
-        return random_mat
\ No newline at end of file
+        return random_mat
+
+
+# number of calls to initializers
+load_counter = Counter()
+
+
+class Model(NodeSI):
+    def __str__(self):
+        return 'model'
+
+    @static_initializer
+    def initialize_slow_model(self):
+        load_counter['slow'] += 1
+        time.sleep(0.2)
+        return np.random.rand(5, 5)
+
+    @static_initializer
+    def initialize_from_path(self, path):
+        load_counter[path] += 1
+        return np.load(path)
+
+    @static_initializer(key=lambda self, variant: variant)
+    def initialize_variant(self, variant):
+        load_counter[variant] += 1
+        return np.full((5, 5), variant)
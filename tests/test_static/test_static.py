@@ -7,4 +7,91 @@ class Test:
         node2 = root.seek('node2c')
         assert np.all(node1.quantum_mat == node2.quantum_mat)
         assert np.all(node1.shared_mat == node2.shared_mat)
-        assert np.all(node1.rand_mat != node2.rand_mat)
\ No newline at end of file
+        assert np.all(node1.rand_mat != node2.rand_mat)
+
+    def test_keyed(self):
+        load_counter.clear()
+        root = Model()
+        assert np.all(root.initialize_variant(1) == 1)
+        assert np.all(root.initialize_variant(2) == 2)
+        assert Model().initialize_variant(1) is root.initialize_variant(1)
+        assert load_counter[1] == 1 and load_counter[2] == 1
+
+        # release one key, or all keys of an initializer
+        Model.initialize_variant.release(root, 1)
+        root.initialize_variant(1)
+        root.initialize_variant(2)
+        assert load_counter[1] == 2 and load_counter[2] == 1
+        Model.initialize_variant.release_all()
+        root.initialize_variant(2)
+        assert load_counter[2] == 2
+
+    def test_thread_safety(self):
+        load_counter.clear()
+        Model.initialize_slow_model.release_all()
+        mats = list()
+        threads = [
+            threading.Thread(target=lambda: mats.append(Model().initialize_slow_model()))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert load_counter['slow'] == 1
+        assert len(mats) == 8 and all(mat is mats[0] for mat in mats)
+
+    def test_eviction(self):
+        manager = StaticModuleManager(maxbytes=1000)
+
+        @manager.static_initializer(key=lambda size: size)
+        def initialize(size):
+            load_counter['size-{}'.format(size)] += 1
+            return np.zeros(size, dtype='uint8')
+
+        load_counter.clear()
+        initialize(400)
+        initialize(500)
+        initialize(400)  # recently used
+        initialize(300)  # evicts 500
+        assert len(manager) == 2 and manager.nbytes == 700
+        initialize(500)
+        assert load_counter['size-500'] == 2 and load_counter['size-400'] == 1
+        # a return larger than maxbytes is kept until the next one
+        initialize(2000)
+        assert len(manager) == 1
+        manager.release()
+        assert len(manager) == 0 and manager.nbytes == 0
+
+    def test_fork(self):
+        import multiprocessing
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            return
+        Model().initialize_variant(3)
+        assert len(static_modules) > 0
+
+        def _child(queue):
+            queue.put(len(static_modules))
+
+        context = multiprocessing.get_context('fork')
+        queue = context.Queue()
+        process = context.Process(target=_child, args=(queue,))
+        process.start()
+        assert queue.get(timeout=10) == 0
+        process.join()
+
+    def test_warm_up(self):
+        load_counter.clear()
+        Model.initialize_slow_model.release_all()
+        future = warm_up(Model, wait=False)
+        report = future.result(timeout=10)
+        assert list(report) == ['Model.initialize_slow_model']  # the ones requiring arguments are skipped
+        assert report['Model.initialize_slow_model'] >= 0.2
+        Model().initialize_slow_model()
+        assert load_counter['slow'] == 1
+
+        # initializers inherited by node classes are loaded once
+        report = warm_up(Node1)
+        assert set(report) == {
+            'Node12.initialize_random_mat', 'Layer.initializer_shared',
+            'Node1C.initializer_unique', 'Node2C.initializer_unique'}